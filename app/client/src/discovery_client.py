@@ -1,22 +1,83 @@
+import re
 import socket
+import selectors
+import struct
 import json
 import threading
 import logging
 import time
-from typing import Dict, List, Optional, Callable, Set
+import heapq
+import itertools
+import queue
+import zlib
+from typing import Dict, List, Optional, Callable, FrozenSet, Tuple
 from dataclasses import dataclass
-from datetime import datetime, timedelta
 import netifaces
+from packaging.version import InvalidVersion, Version
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional
+    def _json_loads(data):
+        # json.loads does not accept memoryview
+        return json.loads(bytes(data))
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Multicast group servers announce themselves on (see DiscoveryService)
+DISCOVERY_GROUP = '239.255.42.99'
+
+RECV_BUFFER_SIZE = 2048  # Reused for every received datagram
+
+# Binary announcement format written by DiscoveryService.encode_announcement;
+# anything not starting with the tag is parsed as JSON
+ANNOUNCE_TAG = 0x01
+ANNOUNCE_HEADER = struct.Struct('!BHBBBB')
+
+# Pulls the version out of a raw announcement without a full JSON parse
+VERSION_PATTERN = re.compile(rb'"version"\s*:\s*"([^"]+)"')
+
+# Latency pings are sent to the announcement's source address and echoed
+# back by DiscoveryService with the type rewritten to pong
+PING_PREFIX = b'{"type": "ping"'
+PONG_PREFIX = b'{"type": "pong"'
+
+# Flood protection for the discovery socket
+MAX_SERVERS = 256  # Distinct servers tracked before evicting the least recently seen
+BROADCAST_RATE_LIMIT = 5.0  # Sustained broadcasts per second accepted from one address
+BROADCAST_BURST = 10.0  # Token bucket capacity per address
+
+def decode_announcement(data: memoryview) -> dict:
+    """Decode a server announcement in either the binary or JSON format."""
+    if data[0] != ANNOUNCE_TAG:
+        return _json_loads(data)
+    
+    _, port, name_len, version_len, status_len, feature_count = ANNOUNCE_HEADER.unpack_from(data)
+    offset = ANNOUNCE_HEADER.size
+    strings = []
+    for length in (name_len, version_len, status_len):
+        strings.append(str(data[offset:offset + length], 'utf-8'))
+        offset += length
+    features = []
+    for _ in range(feature_count):
+        length = data[offset]
+        features.append(str(data[offset + 1:offset + 1 + length], 'utf-8'))
+        offset += 1 + length
+    if offset > len(data):
+        raise ValueError("Truncated announcement")
+    
+    name, version, status = strings
+    return {'name': name, 'port': port, 'version': version,
+            'status': status, 'features': features}
+
+@dataclass(slots=True)
 class ServerInfo:
     name: str
     port: int
     version: str
     status: str
-    last_seen: datetime
+    last_seen: float  # time.monotonic() of the last broadcast
     address: str
     features: List[str]
     latency: Optional[float] = None
@@ -25,15 +86,37 @@ class DiscoveryClient:
     def __init__(self, broadcast_port: int = 5000):
         self.broadcast_port = broadcast_port
         self.running = False
-        self.discovery_thread: Optional[threading.Thread] = None
-        self.servers: Dict[str, ServerInfo] = {}
+        self.reactor_thread: Optional[threading.Thread] = None
+        # Found/lost callbacks run on their own thread so slow handlers
+        # never stall the reactor
+        self.callback_thread: Optional[threading.Thread] = None
+        self._callback_queue: queue.SimpleQueue = queue.SimpleQueue()
+        # Copy-on-write: only the reactor thread swaps in a new dict, other
+        # threads take a single reference and iterate it without locking.
+        self._servers: Dict[str, ServerInfo] = {}
         self.on_server_found: Optional[Callable[[ServerInfo], None]] = None
         self.on_server_lost: Optional[Callable[[ServerInfo], None]] = None
         self.server_timeout = 15  # Seconds before considering a server lost
-        self.required_features: Set[str] = set()
+        self.required_features: FrozenSet[str] = frozenset()
         self.version_constraint: Optional[str] = None
+        self._min_version: Optional[Version] = None  # Parsed once in set_version_constraint
+        self.timeout_check_interval = 1  # Sweep for timed-out servers every second
         self.latency_check_interval = 30  # Check latency every 30 seconds
-        self.latency_thread: Optional[threading.Thread] = None
+        self.poll_interval = 0.5  # Max seconds the reactor waits before re-checking running
+        self._sock: Optional[socket.socket] = None
+        self._iface_addrs: List[str] = []  # Enumerated once per start()
+        # server_id -> source address of its announcements, which answers pings
+        self._echo_addrs: Dict[str, Tuple[str, int]] = {}
+        # nonce -> (server_id, perf_counter() at send) for unanswered pings
+        self._pending_pings: Dict[int, Tuple[str, float]] = {}
+        self._ping_nonces = itertools.count(1)
+        # Min-heap of (latency, server_id); entries are validated lazily on read
+        self._by_latency: List[Tuple[float, str]] = []
+        self._by_latency_lock = threading.Lock()
+        # Sender address -> (hash of last accepted payload, server_id)
+        self._last_payload_hash: Dict[str, Tuple[int, str]] = {}
+        # Sender address -> (tokens, monotonic time of last refill)
+        self._ip_buckets: Dict[str, Tuple[float, float]] = {}
 
     def start(self):
         """Start the discovery client."""
@@ -41,92 +124,243 @@ class DiscoveryClient:
             return
 
         self.running = True
-        self.discovery_thread = threading.Thread(target=self._discovery_loop)
-        self.discovery_thread.daemon = True
-        self.discovery_thread.start()
-        
-        # Start server timeout checker
-        self.timeout_thread = threading.Thread(target=self._check_timeouts)
-        self.timeout_thread.daemon = True
-        self.timeout_thread.start()
+        self._iface_addrs = self._interface_addresses()
+        self.reactor_thread = threading.Thread(target=self._reactor)
+        self.reactor_thread.daemon = True
+        self.reactor_thread.start()
         
-        # Start latency checker
-        self.latency_thread = threading.Thread(target=self._check_latency)
-        self.latency_thread.daemon = True
-        self.latency_thread.start()
+        self.callback_thread = threading.Thread(target=self._callback_worker)
+        self.callback_thread.daemon = True
+        self.callback_thread.start()
         
         logger.info("Discovery client started")
 
     def stop(self):
         """Stop the discovery client."""
         self.running = False
-        if self.discovery_thread:
-            self.discovery_thread.join(timeout=1.0)
-        if self.timeout_thread:
-            self.timeout_thread.join(timeout=1.0)
-        if self.latency_thread:
-            self.latency_thread.join(timeout=1.0)
+        if self.reactor_thread:
+            self.reactor_thread.join(timeout=1.0)
+        if self.callback_thread:
+            self._callback_queue.put(None)  # Wake the worker so it can exit
+            self.callback_thread.join(timeout=1.0)
+        self._pending_pings.clear()
         logger.info("Discovery client stopped")
 
-    def _discovery_loop(self):
-        """Main discovery loop."""
+    def _reactor(self):
+        """Single event loop for broadcasts, timeout sweeps and latency probes."""
+        selector = selectors.DefaultSelector()
+        now = time.monotonic()
+        # Min-heap of (deadline, tie-breaker, task, interval)
+        timers = [
+            (now, 0, self._check_timeouts, self.timeout_check_interval),
+            (now, 1, self._check_latency, self.latency_check_interval),
+        ]
+        heapq.heapify(timers)
+        recv_buffer = memoryview(bytearray(RECV_BUFFER_SIZE))
+        sock = None
         try:
-            # Create UDP socket for receiving broadcasts
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            sock.bind(('', self.broadcast_port))
+            sock = self._open_socket(selector)
             
             while self.running:
-                try:
-                    # Receive server broadcast
-                    data, addr = sock.recvfrom(1024)
-                    server_info = json.loads(data.decode())
-                    
-                    # Check if server meets requirements
-                    if self._meets_requirements(server_info):
-                        # Update server information
-                        self._update_server_info(server_info, addr[0])
-                except Exception as e:
-                    logger.error(f"Error in discovery loop: {e}")
-                    time.sleep(1)
+                # Sleep until the next timer is due, capped so stop() is noticed promptly
+                timeout = min(max(timers[0][0] - time.monotonic(), 0), self.poll_interval)
+                if selector.select(timeout=timeout):
+                    try:
+                        self._receive_broadcast(sock, recv_buffer)
+                    except OSError as e:
+                        # The socket itself is broken; rebuild it
+                        logger.error(f"Discovery socket error, reopening: {e}")
+                        selector.unregister(sock)
+                        sock.close()
+                        sock = None
+                        time.sleep(1)
+                        sock = self._open_socket(selector)
+                    except Exception as e:
+                        logger.error(f"Error in discovery loop: {e}")
+                
+                # Run due timers and reschedule them
+                now = time.monotonic()
+                while timers[0][0] <= now:
+                    _, order, task, interval = heapq.heappop(timers)
+                    try:
+                        task()
+                    except Exception as e:
+                        logger.error(f"Error in discovery task {task.__name__}: {e}")
+                    heapq.heappush(timers, (now + interval, order, task, interval))
         except Exception as e:
             logger.error(f"Error setting up discovery socket: {e}")
         finally:
-            try:
+            self._sock = None
+            selector.close()
+            if sock:
                 sock.close()
-            except:
-                pass
+
+    def _open_socket(self, selector: selectors.BaseSelector) -> socket.socket:
+        """Create the UDP socket for server announcements and register it."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if hasattr(socket, 'SO_REUSEPORT'):  # Not available on Windows
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            sock.bind(('', self.broadcast_port))
+            self._join_multicast_group(sock)
+            sock.setblocking(False)
+            selector.register(sock, selectors.EVENT_READ)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        return sock
+
+    def _callback_worker(self):
+        """Run queued found/lost callbacks off the reactor thread."""
+        while True:
+            item = self._callback_queue.get()
+            if item is None:
+                break
+            callback, server = item
+            try:
+                callback(server)
+            except Exception as e:
+                logger.error(f"Error in discovery callback: {e}")
+
+    def _notify(self, callback: Optional[Callable[[ServerInfo], None]], server: ServerInfo):
+        """Queue a callback for the callback worker."""
+        if callback:
+            self._callback_queue.put((callback, server))
+
+    def _join_multicast_group(self, sock: socket.socket):
+        """Join the discovery multicast group on every IPv4 interface."""
+        group = socket.inet_aton(DISCOVERY_GROUP)
+        joined = 0
+        for address in self._iface_addrs:
+            try:
+                mreq = struct.pack('=4s4s', group, socket.inet_aton(address))
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+                joined += 1
+            except OSError as e:
+                logger.warning(f"Could not join discovery group on {address}: {e}")
+        
+        if not joined:
+            # Let the OS pick the interface
+            mreq = struct.pack('=4sl', group, socket.INADDR_ANY)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        logger.info(f"Joined discovery group {DISCOVERY_GROUP} on {max(joined, 1)} interface(s)")
+
+    def _interface_addresses(self) -> List[str]:
+        """Get the IPv4 address of each local network interface."""
+        addresses = []
+        try:
+            for interface in netifaces.interfaces():
+                for addr in netifaces.ifaddresses(interface).get(netifaces.AF_INET, []):
+                    if 'addr' in addr:
+                        addresses.append(addr['addr'])
+        except Exception as e:
+            logger.error(f"Error enumerating network interfaces: {e}")
+        return addresses
+
+    def _receive_broadcast(self, sock: socket.socket, buffer: memoryview):
+        """Read and process one pending server broadcast."""
+        # Other socket errors propagate so the reactor can rebuild the socket
+        try:
+            nbytes, addr = sock.recvfrom_into(buffer)
+        except (BlockingIOError, ConnectionResetError):
+            # Spurious wakeup, or Windows reporting an unreachable ping target
+            return
+        data = buffer[:nbytes]
+        address = addr[0]
+        
+        try:
+            # Drop floods before spending any CPU on them
+            if not self._allow_packet(address):
+                return
+            
+            if data[:len(PONG_PREFIX)] == PONG_PREFIX:
+                self._handle_pong(data)
+                return
+            
+            # Unchanged broadcast from a known server: only refresh last_seen
+            payload_hash = zlib.crc32(data)  # Writable views are not hashable
+            cached = self._last_payload_hash.get(address)
+            if cached and cached[0] == payload_hash:
+                server = self._servers.get(cached[1])
+                if server is not None:
+                    server.last_seen = time.monotonic()
+                    return
+            
+            # Reject too-old servers before paying for a full JSON parse
+            if (self._min_version is not None and data[0] != ANNOUNCE_TAG
+                    and not self._prescreen_version(data)):
+                return
+            
+            server_info = decode_announcement(data)
+            
+            # Check if server meets requirements
+            if self._meets_requirements(server_info):
+                # Update server information
+                server_id = self._update_server_info(server_info, address)
+                self._last_payload_hash[address] = (payload_hash, server_id)
+                self._echo_addrs[server_id] = addr
+        except (ValueError, KeyError, TypeError, AttributeError, IndexError, struct.error) as e:
+            # Malformed packet: drop it and keep reading
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Ignoring malformed broadcast from %s: %s", address, e)
+
+    def _allow_packet(self, address: str) -> bool:
+        """Apply a per-address token bucket rate limit."""
+        now = time.monotonic()
+        tokens, last_refill = self._ip_buckets.get(address, (BROADCAST_BURST, now))
+        tokens = min(BROADCAST_BURST, tokens + (now - last_refill) * BROADCAST_RATE_LIMIT)
+        allowed = tokens >= 1
+        self._ip_buckets[address] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+    def _prescreen_version(self, data: memoryview) -> bool:
+        """Check the version constraint against the raw payload."""
+        match = VERSION_PATTERN.search(data)
+        if not match:
+            return True  # Let the full parse decide
+        try:
+            return Version(match.group(1).decode()) >= self._min_version
+        except (UnicodeDecodeError, InvalidVersion):
+            return False
 
     def _meets_requirements(self, info: dict) -> bool:
         """Check if server meets the requirements."""
         # Check version constraint
-        if self.version_constraint:
+        if self._min_version is not None:
             try:
-                from packaging import version
-                if not version.parse(info['version']) >= version.parse(self.version_constraint):
+                if not Version(info['version']) >= self._min_version:
                     return False
-            except Exception as e:
+            except (KeyError, TypeError, InvalidVersion) as e:
                 logger.error(f"Error checking version constraint: {e}")
                 return False
 
         # Check required features
         if self.required_features:
-            server_features = set(info.get('features', []))
-            if not self.required_features.issubset(server_features):
+            if not self.required_features.issubset(info.get('features', ())):
                 return False
 
         return True
 
-    def _update_server_info(self, info: dict, address: str):
-        """Update information about a discovered server."""
+    def _update_server_info(self, info: dict, address: str) -> str:
+        """Update information about a discovered server and return its ID."""
         server_id = f"{address}:{info['port']}"
-        now = datetime.now()
+        now = time.monotonic()
         
-        # Check if this is a new server
-        is_new = server_id not in self.servers
+        # Known server: update fields in place and keep its measured latency
+        existing = self._servers.get(server_id)
+        if existing is not None:
+            existing.name = info['name']
+            existing.version = info['version']
+            existing.status = info['status']
+            existing.features = info.get('features', [])
+            existing.last_seen = now
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Updated server information for %s", server_id)
+            return server_id
         
-        # Update server information
-        self.servers[server_id] = ServerInfo(
+        server = ServerInfo(
             name=info['name'],
             port=info['port'],
             version=info['version'],
@@ -137,69 +371,133 @@ class DiscoveryClient:
             latency=None
         )
         
+        # Add the new server
+        servers = dict(self._servers)
+        evicted = None
+        if len(servers) >= MAX_SERVERS:
+            # Evict the least recently seen server to bound memory
+            evicted_id = min(servers, key=lambda sid: servers[sid].last_seen)
+            evicted = (evicted_id, servers.pop(evicted_id))
+        servers[server_id] = server
+        self._servers = servers
+        
+        if evicted:
+            logger.warning(f"Server limit reached, evicting {evicted[0]}")
+            self._forget_server(*evicted)
+        
         # Notify about new server
-        if is_new and self.on_server_found:
-            self.on_server_found(self.servers[server_id])
+        self._notify(self.on_server_found, server)
             
-        logger.debug(f"Updated server information for {server_id}")
+        logger.debug(f"Added server information for {server_id}")
+        return server_id
 
     def _check_timeouts(self):
-        """Check for timed-out servers."""
-        while self.running:
-            try:
-                now = datetime.now()
-                timed_out = []
-                
-                # Check each server
-                for server_id, server in self.servers.items():
-                    if now - server.last_seen > timedelta(seconds=self.server_timeout):
-                        timed_out.append(server_id)
-                        if self.on_server_lost:
-                            self.on_server_lost(server)
-                
-                # Remove timed-out servers
-                for server_id in timed_out:
-                    del self.servers[server_id]
-                    logger.info(f"Server {server_id} timed out")
-                
-                time.sleep(1)  # Check every second
-            except Exception as e:
-                logger.error(f"Error checking server timeouts: {e}")
-                time.sleep(1)
+        """Remove servers that have not broadcast within the timeout."""
+        # Entries older than this monotonic timestamp have timed out
+        cutoff = time.monotonic() - self.server_timeout
+        
+        # Drop rate limit state for addresses that went quiet
+        self._ip_buckets = {address: bucket for address, bucket in self._ip_buckets.items()
+                            if bucket[1] >= cutoff}
+        
+        # Check each server
+        timed_out = [server_id for server_id, server in self._servers.items()
+                     if server.last_seen < cutoff]
+        if not timed_out:
+            return
+        
+        # Remove timed-out servers
+        servers = dict(self._servers)
+        lost = [(server_id, servers.pop(server_id)) for server_id in timed_out]
+        self._servers = servers
+        
+        for server_id, server in lost:
+            logger.info(f"Server {server_id} timed out")
+            self._forget_server(server_id, server)
+
+    def _forget_server(self, server_id: str, server: ServerInfo):
+        """Release per-server state and notify that a server was lost."""
+        self._echo_addrs.pop(server_id, None)
+        self._last_payload_hash.pop(server.address, None)
+        self._notify(self.on_server_lost, server)
 
     def _check_latency(self):
-        """Check latency to all servers periodically."""
-        while self.running:
+        """Send a UDP ping to every known server; replies arrive in the reactor."""
+        # Pings left over from the previous round were never answered
+        for server_id, _ in self._pending_pings.values():
+            server = self._servers.get(server_id)
+            if server is not None:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Error checking latency to %s: no reply", server_id)
+                server.latency = None
+        self._pending_pings.clear()
+        
+        for server_id in self._servers:
+            echo_addr = self._echo_addrs.get(server_id)
+            if echo_addr is None:
+                continue
+            nonce = next(self._ping_nonces)
             try:
-                for server_id, server in self.servers.items():
-                    try:
-                        start_time = time.time()
-                        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                        sock.settimeout(1.0)
-                        sock.connect((server.address, server.port))
-                        sock.close()
-                        latency = (time.time() - start_time) * 1000  # Convert to milliseconds
-                        server.latency = latency
-                        logger.debug(f"Latency to {server_id}: {latency:.2f}ms")
-                    except Exception as e:
-                        logger.debug(f"Error checking latency to {server_id}: {e}")
-                        server.latency = None
-                time.sleep(self.latency_check_interval)
-            except Exception as e:
-                logger.error(f"Error in latency check loop: {e}")
-                time.sleep(1)
+                self._sock.sendto(PING_PREFIX + b', "nonce": %d}' % nonce, echo_addr)
+                self._pending_pings[nonce] = (server_id, time.perf_counter())
+            except OSError as e:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Error checking latency to %s: %s", server_id, e)
+
+    def _handle_pong(self, data: memoryview):
+        """Complete a latency measurement from a ping reply."""
+        pending = self._pending_pings.pop(_json_loads(data).get('nonce'), None)
+        if pending is None:
+            return
+        server_id, sent_at = pending
+        server = self._servers.get(server_id)
+        if server is None:
+            return
+        latency = (time.perf_counter() - sent_at) * 1000  # Convert to milliseconds
+        server.latency = latency
+        self._push_latency(latency, server_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Latency to %s: %.2fms", server_id, latency)
 
     def get_available_servers(self) -> List[ServerInfo]:
         """Get list of currently available servers."""
-        return list(self.servers.values())
+        return list(self._servers.values())
+
+    def _push_latency(self, latency: float, server_id: str):
+        """Record a latency measurement in the best-server heap."""
+        with self._by_latency_lock:
+            heapq.heappush(self._by_latency, (latency, server_id))
+            # Superseded entries pile up below the head; compact occasionally
+            if len(self._by_latency) > 4 * max(len(self._servers), 16):
+                self._by_latency = [entry for entry in self._by_latency
+                                    if not self._is_stale_latency(*entry)]
+                heapq.heapify(self._by_latency)
+
+    def _is_stale_latency(self, latency: float, server_id: str) -> bool:
+        """Check whether a heap entry no longer reflects a known server."""
+        server = self._servers.get(server_id)
+        return server is None or server.latency != latency
 
     def get_best_server(self) -> Optional[ServerInfo]:
         """Get the best available server based on latency and status."""
-        available_servers = [s for s in self.servers.values() 
-                           if s.status == 'running' and s.latency is not None]
-        if not available_servers:
+        with self._by_latency_lock:
+            heap = self._by_latency
+            while heap and self._is_stale_latency(*heap[0]):
+                heapq.heappop(heap)
+            if not heap:
+                return None
+            
+            server = self._servers.get(heap[0][1])
+            if server is not None and server.status == 'running':
+                return server
+            
+            # Fastest server is not running; fall back to walking the heap in order
+            for latency, server_id in sorted(heap):
+                server = self._servers.get(server_id)
+                if (server is not None and server.latency == latency
+                        and server.status == 'running'):
+                    return server
             return None
-        return min(available_servers, key=lambda s: s.latency)
 
     def set_server_found_callback(self, callback: Callable[[ServerInfo], None]):
         """Set callback for when a new server is discovered."""
@@ -211,8 +509,9 @@ class DiscoveryClient:
 
     def set_required_features(self, features: List[str]):
         """Set required features for servers."""
-        self.required_features = set(features)
+        self.required_features = frozenset(features)
 
     def set_version_constraint(self, version: str):
         """Set minimum required server version."""
+        self._min_version = Version(version) if version else None
         self.version_constraint = version 
\ No newline at end of file
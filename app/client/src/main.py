@@ -2,28 +2,45 @@ import sys
 import os
 import json
 import ctypes
+import functools
 import hashlib
 import base64
 from datetime import datetime, timedelta
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QLineEdit, QMessageBox, QDialog, QFormLayout, QDialogButtonBox, QComboBox, QDoubleSpinBox, QListWidget, QListWidgetItem, QTableWidget, QTableWidgetItem, QGroupBox, QCheckBox, QColor
+    QPushButton, QLabel, QLineEdit, QMessageBox, QDialog, QFormLayout, QDialogButtonBox, QComboBox, QDoubleSpinBox, QTableWidget, QTableWidgetItem,
+    QGroupBox, QCheckBox
 )
-from PySide6.QtCore import Qt, QTimer, Signal, Slot, QObject
-from PySide6.QtGui import QIcon, QFont, QColor
+from PySide6.QtCore import Qt, QTimer, Signal, Slot, QObject, QRunnable, QThreadPool, QSettings, QEvent
+from PySide6.QtGui import QColor
 import time
 import logging
 import secrets
+import weakref
+from typing import Dict
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    _json_loads = json.loads
+
+_SCRIPT_PATH = os.path.abspath(__file__)
+_SRC_DIR = os.path.dirname(_SCRIPT_PATH)
+_APPS_CONFIG_PATH = os.path.join(_SRC_DIR, 'apps_config.json')
+_KIOSK_BAT_PATH = os.path.join(_SRC_DIR, 'run_kiosk.bat')
+# Pre-QSettings location of the connection settings, read once to migrate them
+_LEGACY_CONFIG_PATH = os.path.join(_SRC_DIR, '..', 'config.json')
 
 # Add the src directory to Python path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(_SRC_DIR)
 
 from network_manager import NetworkManager
 from system_locker import SystemLocker
-from shell_manager import ShellManager
+from shell_manager import ShellManager, is_admin
 from config import (
     WINDOW_TITLE, WINDOW_MIN_WIDTH, WINDOW_MIN_HEIGHT,
     DEFAULT_SERVER_IP, DEFAULT_SERVER_PORT,
@@ -34,12 +51,10 @@ from discovery_client import DiscoveryClient, ServerInfo
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def is_admin():
-    """Check if running with administrator privileges."""
-    try:
-        return ctypes.windll.shell32.IsUserAnAdmin() != 0
-    except:
-        return False
+# Status/latency colours for the server table, built once
+_COLOR_GREEN = QColor(0, 128, 0)
+_COLOR_ORANGE = QColor(255, 165, 0)
+_COLOR_RED = QColor(Qt.red)
 
 def run_as_admin():
     """Restart the program with administrator privileges."""
@@ -59,38 +74,73 @@ class StatusUpdater(QObject):
     status_changed = Signal(str)
     session_started = Signal(int, int)  # session_id, duration
     session_ended = Signal(bool)  # force_end
+    key_ready = Signal(bytes, int, int)  # session_key, session_id, duration
+    servers_changed = Signal()
+
+class KeyDerivationTask(QRunnable):
+    """Derive a session key on the thread pool and report back via StatusUpdater."""
+    def __init__(self, status_updater: StatusUpdater, session_id: int, duration: int):
+        super().__init__()
+        self.status_updater = status_updater
+        self.session_id = session_id
+        self.duration = duration
+
+    def run(self):
+        key = SessionManager.derive_session_key()
+        self.status_updater.key_ready.emit(key, self.session_id, self.duration)
 
 class SessionManager:
     def __init__(self):
         self.session_key = None
         self.fernet = None
         self.session_id = None
-        self.session_start = None
+        self.session_start = None  # wall clock, only used for reporting
         self.session_duration = None
-        self.last_activity = None
+        self.last_activity = None  # time.monotonic()
+        self._start_mono = 0.0
+        self._duration_s = 0
         self.inactivity_timeout = 300  # 5 minutes
+        self._iv_pool = memoryview(b'')
+        self._iv_offset = 0
         self.inactivity_timer = None
         
+    @staticmethod
+    def derive_session_key() -> bytes:
+        """Generate a new session key. Safe to call off the GUI thread.
+
+        The key material is 256 random bits, not a password, so there is
+        nothing for a KDF to stretch.
+        """
+        return base64.urlsafe_b64encode(secrets.token_bytes(32))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def fernet_class():
+        """Import the Fernet implementation on first use; cryptography is a heavy import."""
+        try:
+            from rfernet import Fernet  # Rust-backed, same API
+        except ImportError:
+            from cryptography.fernet import Fernet
+        return Fernet
+
     def generate_session_key(self):
-        """Generate a new session key using PBKDF2."""
-        salt = secrets.token_bytes(16)
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(secrets.token_bytes(32)))
-        self.fernet = Fernet(key)
+        """Generate a new session key and set up its Fernet."""
+        key = self.derive_session_key()
+        self.fernet = self.fernet_class()(key.decode())
         return key
         
-    def start_session(self, session_id: int, duration: int):
+    def start_session(self, session_id: int, duration: int, session_key: bytes = None):
         """Start a new session with encryption and inactivity monitoring."""
         self.session_id = session_id
         self.session_start = datetime.now()
         self.session_duration = duration
-        self.last_activity = datetime.now()
-        self.session_key = self.generate_session_key()
+        self._start_mono = self.last_activity = time.monotonic()
+        self._duration_s = duration * 3600
+        if session_key is None:
+            self.session_key = self.generate_session_key()
+        else:
+            self.session_key = session_key
+            self.fernet = self.fernet_class()(session_key.decode())
         
         # Setup inactivity timer
         self._setup_inactivity_timer()
@@ -98,28 +148,20 @@ class SessionManager:
         return self.session_key
         
     def _setup_inactivity_timer(self):
-        """Setup timer to monitor user inactivity."""
+        """Setup a single-shot deadline timer that fires after inactivity_timeout."""
         if self.inactivity_timer:
             self.inactivity_timer.stop()
         
         self.inactivity_timer = QTimer()
-        self.inactivity_timer.timeout.connect(self._check_inactivity)
-        self.inactivity_timer.start(60000)  # Check every minute
-        
-    def _check_inactivity(self):
-        """Check for user inactivity and handle accordingly."""
-        if not self.last_activity:
-            return
-            
-        inactive_time = (datetime.now() - self.last_activity).total_seconds()
-        if inactive_time >= self.inactivity_timeout:
-            logger.warning(f"User inactive for {inactive_time} seconds")
-            self._handle_inactivity()
+        self.inactivity_timer.setSingleShot(True)
+        self.inactivity_timer.timeout.connect(self._handle_inactivity)
+        self.inactivity_timer.start(self.inactivity_timeout * 1000)
             
     def _handle_inactivity(self):
         """Handle user inactivity."""
-        # Reset last activity to prevent multiple notifications
-        self.last_activity = datetime.now()
+        logger.warning(f"User inactive for {time.monotonic() - self.last_activity:.0f} seconds")
+        # Reset last activity and re-arm the deadline to prevent multiple notifications
+        self.update_activity()
         
         # Notify the user
         QMessageBox.warning(
@@ -130,20 +172,39 @@ class SessionManager:
         )
         
     def update_activity(self):
-        """Update the last activity timestamp."""
-        self.last_activity = datetime.now()
+        """Update the last activity timestamp and push the inactivity deadline back."""
+        self.last_activity = time.monotonic()
+        if self.inactivity_timer:
+            self.inactivity_timer.start(self.inactivity_timeout * 1000)
         
     def encrypt_message(self, message: dict) -> str:
         """Encrypt a message using the session key."""
         if not self.fernet:
             raise ValueError("No active session")
-        return self.fernet.encrypt(json.dumps(message).encode()).decode()
-        
-    def decrypt_message(self, encrypted_message: str) -> dict:
-        """Decrypt a message using the session key."""
+        token = self._encrypt(_json_dumps(message))
+        return token if isinstance(token, str) else token.decode()
+
+    def _next_iv(self) -> bytes:
+        """Return a fresh random IV, refilling the pool with one getrandom call per 256 IVs."""
+        if self._iv_offset >= len(self._iv_pool):
+            self._iv_pool = memoryview(os.urandom(16 * 256))
+            self._iv_offset = 0
+        iv = self._iv_pool[self._iv_offset:self._iv_offset + 16].tobytes()
+        self._iv_offset += 16
+        return iv
+
+    def _encrypt(self, data: bytes):
+        """Encrypt with a pooled random IV when the Fernet implementation allows it."""
+        encrypt_from_parts = getattr(self.fernet, '_encrypt_from_parts', None)
+        if encrypt_from_parts is None:
+            return self.fernet.encrypt(data)
+        return encrypt_from_parts(data, int(time.time()), self._next_iv())
+        
+    def decrypt_message(self, encrypted_message) -> dict:
+        """Decrypt a message (str or bytes token) using the session key."""
         if not self.fernet:
             raise ValueError("No active session")
-        return json.loads(self.fernet.decrypt(encrypted_message.encode()).decode())
+        return _json_loads(self.fernet.decrypt(encrypted_message))
         
     def get_session_info(self) -> dict:
         """Get current session information."""
@@ -154,16 +215,16 @@ class SessionManager:
             'start_time': self.session_start.isoformat(),
             'duration': self.session_duration,
             'remaining': self.get_remaining_time(),
-            'last_activity': self.last_activity.isoformat() if self.last_activity else None
+            'last_activity': (
+                self.session_start + timedelta(seconds=self.last_activity - self._start_mono)
+            ).isoformat() if self.last_activity else None
         }
         
     def get_remaining_time(self) -> int:
         """Get remaining session time in seconds."""
         if not self.session_start:
             return 0
-        elapsed = (datetime.now() - self.session_start).total_seconds()
-        remaining = (self.session_duration * 3600) - elapsed
-        return max(0, int(remaining))
+        return max(0, int(self._start_mono + self._duration_s - time.monotonic()))
         
     def end_session(self):
         """End the current session and cleanup."""
@@ -207,7 +268,16 @@ class GamingCenterClient(QMainWindow):
         self.system_locker = SystemLocker()
         self.shell_manager = ShellManager()
         self.current_session = None
+        self._server_table_ref = None
+        self._server_list_refresh_pending = False
+        self._row_by_addr: Dict[str, int] = {}
         self.status_updater = StatusUpdater()
+        
+        # Kiosk launcher content only depends on the interpreter and this script
+        self._kiosk_bat_content = (
+            f'@echo off\r\n"{sys.executable}" "{_SCRIPT_PATH}" --kiosk-mode\r\n'
+        ).encode()
+        self._kiosk_bat_digest = hashlib.blake2b(self._kiosk_bat_content, digest_size=16).digest()
         self.discovery_client = DiscoveryClient()
         self.discovery_client.set_server_found_callback(self._on_server_found)
         self.discovery_client.set_server_lost_callback(self._on_server_lost)
@@ -216,6 +286,8 @@ class GamingCenterClient(QMainWindow):
         self.status_updater.status_changed.connect(self.update_status_label)
         self.status_updater.session_started.connect(self.start_session)
         self.status_updater.session_ended.connect(self.end_session)
+        self.status_updater.key_ready.connect(self._on_session_key_ready)
+        self.status_updater.servers_changed.connect(self._schedule_server_refresh)
         
         self.setup_ui()
         self.load_config()
@@ -226,25 +298,19 @@ class GamingCenterClient(QMainWindow):
         self.setup_activity_monitoring()
 
     def setup_activity_monitoring(self):
-        """Setup monitoring for user activity."""
-        # Monitor mouse movement
-        self.setMouseTracking(True)
-        
-        # Monitor keyboard events
+        """Setup monitoring for user activity (clicks and key presses)."""
+        self._last_activity_mono = 0.0
+        self._bump_activity = self.session_manager.update_activity
         self.installEventFilter(self)
         
     def eventFilter(self, obj, event):
-        """Filter events to detect user activity."""
-        if event.type() in (event.MouseButtonPress, event.KeyPress):
-            if self.session_manager:
-                self.session_manager.update_activity()
+        """Filter events to detect user activity, at most once per second."""
+        if event.type() in (QEvent.MouseButtonPress, QEvent.KeyPress):
+            now = time.monotonic()
+            if now - self._last_activity_mono >= 1.0:
+                self._last_activity_mono = now
+                self._bump_activity()
         return super().eventFilter(obj, event)
-        
-    def mouseMoveEvent(self, event):
-        """Handle mouse movement events."""
-        if self.session_manager:
-            self.session_manager.update_activity()
-        super().mouseMoveEvent(event)
 
     def setup_network_handlers(self):
         """Setup network message handlers."""
@@ -260,8 +326,23 @@ class GamingCenterClient(QMainWindow):
             duration = message['duration']
             logger.info(f"Starting session {session_id} for {duration} hours")
             
+            # Derive the session key off the GUI thread; the rest happens in _on_session_key_ready
+            QThreadPool.globalInstance().start(
+                KeyDerivationTask(self.status_updater, session_id, duration)
+            )
+        except Exception as e:
+            logger.error(f"Error handling start session: {e}")
+            QMessageBox.critical(
+                self,
+                "Error",
+                f"Failed to start session: {str(e)}"
+            )
+
+    def _on_session_key_ready(self, session_key: bytes, session_id: int, duration: int):
+        """Finish session start once the key has been derived."""
+        try:
             # Start encrypted session
-            session_key = self.session_manager.start_session(session_id, duration)
+            session_key = self.session_manager.start_session(session_id, duration, session_key)
             
             # Send encrypted acknowledgment
             ack_message = {
@@ -352,6 +433,8 @@ class GamingCenterClient(QMainWindow):
         # Time remaining
         self.time_label = QLabel("")
         self.time_label.setAlignment(Qt.AlignCenter)
+        self._fmt = "Time remaining: %02d:%02d:%02d".__mod__
+        self._last_time_text = ""
         layout.addWidget(self.time_label)
 
         # End session button
@@ -366,32 +449,37 @@ class GamingCenterClient(QMainWindow):
         self.update_timer.start(1000)  # Update every second
 
     def load_config(self):
-        """Load configuration from file."""
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+        """Load configuration from QSettings (the registry on Windows)."""
         try:
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                    self.server_ip_input.setText(config.get('server_ip', DEFAULT_SERVER_IP))
-                    self.server_port_input.setText(str(config.get('server_port', DEFAULT_SERVER_PORT)))
-            else:
-                self.server_ip_input.setText(DEFAULT_SERVER_IP)
-                self.server_port_input.setText(str(DEFAULT_SERVER_PORT))
+            settings = QSettings("GamingCenter", "Client")
+            if not settings.contains("server_ip") and os.path.exists(_LEGACY_CONFIG_PATH):
+                self._migrate_legacy_config(settings)
+            self.server_ip_input.setText(str(settings.value("server_ip", DEFAULT_SERVER_IP)))
+            self.server_port_input.setText(str(settings.value("server_port", DEFAULT_SERVER_PORT)))
         except Exception as e:
             logger.error(f"Error loading config: {e}")
             self.server_ip_input.setText(DEFAULT_SERVER_IP)
             self.server_port_input.setText(str(DEFAULT_SERVER_PORT))
 
+    def _migrate_legacy_config(self, settings):
+        """Copy server_ip/server_port from the old config.json into QSettings."""
+        try:
+            with open(_LEGACY_CONFIG_PATH, 'r') as f:
+                config = json.load(f)
+            if 'server_ip' in config:
+                settings.setValue("server_ip", config['server_ip'])
+            if 'server_port' in config:
+                settings.setValue("server_port", int(config['server_port']))
+            logger.info("Migrated connection settings from config.json")
+        except Exception as e:
+            logger.error(f"Error migrating legacy config: {e}")
+
     def save_config(self):
-        """Save configuration to file."""
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+        """Save configuration to QSettings; Qt flushes it lazily."""
         try:
-            config = {
-                'server_ip': self.server_ip_input.text(),
-                'server_port': int(self.server_port_input.text())
-            }
-            with open(config_path, 'w') as f:
-                json.dump(config, f)
+            settings = QSettings("GamingCenter", "Client")
+            settings.setValue("server_ip", self.server_ip_input.text())
+            settings.setValue("server_port", int(self.server_port_input.text()))
         except Exception as e:
             logger.error(f"Error saving config: {e}")
 
@@ -413,16 +501,19 @@ class GamingCenterClient(QMainWindow):
     def update_status(self):
         """Update the status display."""
         if self.current_session:
-            remaining = self.current_session['end_time'] - datetime.now()
-            if remaining.total_seconds() > 0:
-                hours = int(remaining.total_seconds() // 3600)
-                minutes = int((remaining.total_seconds() % 3600) // 60)
-                seconds = int(remaining.total_seconds() % 60)
-                self.time_label.setText(f"Time remaining: {hours:02d}:{minutes:02d}:{seconds:02d}")
+            remaining = int(self._end_monotonic - time.monotonic())
+            if remaining > 0:
+                minutes, seconds = divmod(remaining, 60)
+                hours, minutes = divmod(minutes, 60)
+                text = self._fmt((hours, minutes, seconds))
+                # setText invalidates the layout even when the text is unchanged
+                if text != self._last_time_text:
+                    self.time_label.setText(text)
+                    self._last_time_text = text
                 
                 # Update kiosk window time display
                 if self.shell_manager.kiosk_window:
-                    self.shell_manager.kiosk_window.update_time(int(remaining.total_seconds()))
+                    self.shell_manager.kiosk_window.update_time(remaining)
             else:
                 self.end_session()
 
@@ -431,36 +522,30 @@ class GamingCenterClient(QMainWindow):
         try:
             self.current_session = {
                 'id': session_id,
-                'start_time': datetime.now(),
-                'end_time': datetime.now() + timedelta(hours=duration)
+                'start_time': datetime.now()
             }
+            self._end_monotonic = time.monotonic() + duration * 3600.0
             self.session_label.setText(f"Session {session_id} active")
             self.time_label.setText(f"Duration: {duration} hours")
+            self._last_time_text = ""
             self.end_session_btn.setEnabled(True)
             
             # Start system lockdown
             self.system_locker.start_monitoring()
             
             # Load application configuration
-            config_path = os.path.join(os.path.dirname(__file__), 'apps_config.json')
-            self.shell_manager.load_app_config(config_path)
+            self.shell_manager.load_app_config(_APPS_CONFIG_PATH)
             
             # Hide the main window before starting kiosk mode
             self.hide()
             
-            # Get the full path to the Python executable
-            python_exe = sys.executable
-            script_path = os.path.abspath(__file__)
-            
-            logger.info(f"Starting kiosk mode with Python: {python_exe}")
-            logger.info(f"Script path: {script_path}")
+            logger.info(f"Starting kiosk mode with Python: {sys.executable}")
+            logger.info(f"Script path: {_SCRIPT_PATH}")
             
-            # Create a batch file to run the script
-            batch_path = os.path.join(os.path.dirname(script_path), "run_kiosk.bat")
-            with open(batch_path, "w") as f:
-                f.write(f'@echo off\n"{python_exe}" "{script_path}" --kiosk-mode\n')
+            # Create a batch file to run the script, unless an identical one exists
+            self._ensure_kiosk_bat(_KIOSK_BAT_PATH)
             
-            if not self.shell_manager.start_kiosk_mode(None, batch_path):
+            if not self.shell_manager.start_kiosk_mode(None, _KIOSK_BAT_PATH):
                 logger.error("Failed to start kiosk mode")
                 self.show()  # Show main window if kiosk mode fails
                 QMessageBox.warning(
@@ -483,6 +568,17 @@ class GamingCenterClient(QMainWindow):
                 f"Failed to start session: {str(e)}"
             )
 
+    def _ensure_kiosk_bat(self, batch_path: str):
+        """Write the kiosk launcher only if it is missing or its content differs."""
+        try:
+            with open(batch_path, "rb") as f:
+                if hashlib.blake2b(f.read(), digest_size=16).digest() == self._kiosk_bat_digest:
+                    return
+        except FileNotFoundError:
+            pass
+        with open(batch_path, "wb") as f:
+            f.write(self._kiosk_bat_content)
+
     def end_session(self, force_end=False):
         """End the current session with proper cleanup."""
         if self.current_session:
@@ -521,6 +617,7 @@ class GamingCenterClient(QMainWindow):
                 self.current_session = None
                 self.session_label.setText("No active session")
                 self.time_label.setText("")
+                self._last_time_text = ""
                 self.end_session_btn.setEnabled(False)
                 logger.info("Session ended")
                 if force_end:
@@ -584,6 +681,7 @@ class GamingCenterClient(QMainWindow):
 
     def _show_server_selection(self):
         """Show server selection dialog."""
+        
         dialog = QDialog(self)
         dialog.setWindowTitle("Select Server")
         dialog.setModal(True)
@@ -600,6 +698,9 @@ class GamingCenterClient(QMainWindow):
         server_list.setSelectionBehavior(QTableWidget.SelectRows)
         server_list.setSelectionMode(QTableWidget.SingleSelection)
         server_list.horizontalHeader().setStretchLastSection(True)
+        self._server_table_ref = weakref.ref(server_list)
+        self._row_by_addr.clear()
+        dialog.finished.connect(self._on_server_dialog_finished)
         layout.addWidget(QLabel("Available Servers:"))
         layout.addWidget(server_list)
         
@@ -654,42 +755,87 @@ class GamingCenterClient(QMainWindow):
         dialog.exec_()
 
     def _update_server_list(self, server_list: QTableWidget):
-        """Update the server list widget."""
-        server_list.setRowCount(0)
-        for server in self.discovery_client.get_available_servers():
-            row = server_list.rowCount()
-            server_list.insertRow(row)
+        """Update the server list widget, touching only the rows that changed."""
+        servers = {
+            f"{server.address}:{server.port}": server
+            for server in self.discovery_client.get_available_servers()
+        }
+        row_by_addr = self._row_by_addr
+        structural = False
+        server_list.setUpdatesEnabled(False)
+        
+        # Drop departed servers bottom-up so earlier row indices stay valid
+        departed = sorted(
+            (row for addr, row in row_by_addr.items() if addr not in servers),
+            reverse=True
+        )
+        if departed:
+            for row in departed:
+                server_list.removeRow(row)
+            row_by_addr.clear()
+            for row in range(server_list.rowCount()):
+                row_by_addr[server_list.item(row, 1).text()] = row
+            structural = True
+        
+        for addr, server in servers.items():
+            row = row_by_addr.get(addr)
+            if row is None:
+                row = server_list.rowCount()
+                server_list.insertRow(row)
+                row_by_addr[addr] = row
+                server_list.setItem(row, 0, QTableWidgetItem(server.name))
+                server_list.setItem(row, 1, QTableWidgetItem(addr))
+                server_list.setItem(row, 2, QTableWidgetItem(server.version))
+                server_list.setItem(row, 3, QTableWidgetItem())
+                server_list.setItem(row, 4, QTableWidgetItem())
+                structural = True
             
-            # Server name
-            name_item = QTableWidgetItem(server.name)
+            # Server name carries the latest ServerInfo for the details/connect handlers
+            name_item = server_list.item(row, 0)
             name_item.setData(Qt.UserRole, server)
-            server_list.setItem(row, 0, name_item)
-            
-            # Address
-            server_list.setItem(row, 1, QTableWidgetItem(f"{server.address}:{server.port}"))
             
-            # Version
-            server_list.setItem(row, 2, QTableWidgetItem(server.version))
+            # Name and version change when a server is renamed or upgraded
+            if name_item.text() != server.name:
+                name_item.setText(server.name)
+                structural = True
+            version_item = server_list.item(row, 2)
+            if version_item.text() != server.version:
+                version_item.setText(server.version)
+                structural = True
             
             # Status
-            status_item = QTableWidgetItem(server.status)
-            status_item.setForeground(
-                QColor("green") if server.status == "running" else QColor("red")
-            )
-            server_list.setItem(row, 3, status_item)
+            status_item = server_list.item(row, 3)
+            if status_item.text() != server.status:
+                status_item.setText(server.status)
+                status_item.setForeground(
+                    _COLOR_GREEN if server.status == "running" else _COLOR_RED
+                )
             
             # Latency
             latency_text = f"{server.latency:.1f}ms" if server.latency else "N/A"
-            latency_item = QTableWidgetItem(latency_text)
-            if server.latency:
-                latency_item.setForeground(
-                    QColor("green") if server.latency < 100 else
-                    QColor("orange") if server.latency < 300 else
-                    QColor("red")
-                )
-            server_list.setItem(row, 4, latency_item)
+            latency_item = server_list.item(row, 4)
+            if latency_item.text() != latency_text:
+                latency_item.setText(latency_text)
+                if server.latency:
+                    latency_item.setForeground(
+                        _COLOR_GREEN if server.latency < 100 else
+                        _COLOR_ORANGE if server.latency < 300 else
+                        _COLOR_RED
+                    )
+                else:
+                    # Back to the default colour, as a fresh "N/A" item has
+                    latency_item.setData(Qt.ForegroundRole, None)
         
-        server_list.resizeColumnsToContents()
+        # Re-measuring columns is expensive; only do it when rows came or went
+        # or a name or version changed
+        if structural:
+            server_list.resizeColumnsToContents()
+        server_list.setUpdatesEnabled(True)
+
+    def _on_server_dialog_finished(self, result: int):
+        """Drop the table reference once the server selection dialog closes."""
+        self._server_table_ref = None
+        self._row_by_addr.clear()
 
     def _update_server_details(self, server_list: QTableWidget):
         """Update the server details section."""
@@ -726,22 +872,27 @@ class GamingCenterClient(QMainWindow):
     def _on_server_found(self, server: ServerInfo):
         """Handle new server discovery."""
         logger.info(f"Discovered server: {server.name} ({server.address}:{server.port})")
-        # Update UI if server selection dialog is open
-        for widget in self.topLevelWidgets():
-            if isinstance(widget, QDialog) and widget.windowTitle() == "Select Server":
-                for child in widget.findChildren(QListWidget):
-                    self._update_server_list(child)
-                break
+        # Discovery callbacks run off the GUI thread; hop over via a queued signal
+        self.status_updater.servers_changed.emit()
 
     def _on_server_lost(self, server: ServerInfo):
         """Handle server loss."""
         logger.info(f"Lost server: {server.name} ({server.address}:{server.port})")
-        # Update UI if server selection dialog is open
-        for widget in self.topLevelWidgets():
-            if isinstance(widget, QDialog) and widget.windowTitle() == "Select Server":
-                for child in widget.findChildren(QListWidget):
-                    self._update_server_list(child)
-                break
+        self.status_updater.servers_changed.emit()
+
+    def _schedule_server_refresh(self):
+        """Coalesce bursts of discovery events into one table refresh per 100 ms."""
+        if self._server_list_refresh_pending:
+            return
+        self._server_list_refresh_pending = True
+        QTimer.singleShot(100, self._do_server_refresh)
+
+    def _do_server_refresh(self):
+        """Update the server table if the server selection dialog is open."""
+        self._server_list_refresh_pending = False
+        table = self._server_table_ref() if self._server_table_ref else None
+        if table is not None:
+            self._update_server_list(table)
 
 class PaymentDialog(QDialog):
     def __init__(self, default_amount: float, parent=None):
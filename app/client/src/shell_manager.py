@@ -1,61 +1,184 @@
 import os
 import sys
 import winreg
+import ctypes
+from ctypes import wintypes
 import logging
 import subprocess
 import json
-from typing import List, Optional, Dict
+import functools
+from typing import List, Optional, Dict, Tuple
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, 
-    QMessageBox, QFrame, QGridLayout, QApplication, QComboBox, QStackedWidget
+    QMessageBox, QFrame, QApplication, QComboBox, QListView
 )
-from PySide6.QtCore import Qt, QTimer, Signal, QSize
-from PySide6.QtGui import QDesktopServices, QFont, QIcon, QPixmap
+from PySide6.QtCore import (
+    Qt, QTimer, Signal, QSize, QObject, QRunnable, QThreadPool,
+    QModelIndex, QSortFilterProxyModel, QRegularExpression
+)
+from PySide6.QtGui import QDesktopServices, QFont, QIcon, QPixmap, QImage, QStandardItem, QStandardItemModel
 from PySide6.QtCore import QUrl
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Policy values toggled while kiosk mode is active, grouped by subkey
+_POLICY_SYSTEM = r"Software\Microsoft\Windows\CurrentVersion\Policies\System"
+_POLICY_EXPLORER = r"Software\Microsoft\Windows\CurrentVersion\Policies\Explorer"
+_KIOSK_POLICIES = {
+    _POLICY_SYSTEM: ("DisableTaskMgr", "NoAltTab", "DisableCAD"),
+    _POLICY_EXPLORER: ("NoWinKeys", "NoViewContextMenu"),
+}
+# Parsed app configs keyed by path -> (mtime_ns, {name: AppConfig})
+_APP_CFG_CACHE: Dict[str, Tuple[int, Dict[str, "AppConfig"]]] = {}
+
+# Resolve IsUserAnAdmin once and declare its signature up front
+try:
+    _IsUserAnAdmin = ctypes.WinDLL('shell32').IsUserAnAdmin
+    _IsUserAnAdmin.restype = ctypes.c_int
+    _IsUserAnAdmin.argtypes = ()
+except (AttributeError, OSError):
+    _IsUserAnAdmin = None
+
+@functools.lru_cache(maxsize=None)
+def is_admin() -> bool:
+    """Check if running with administrator privileges (cached; cannot change at runtime)."""
+    try:
+        return _IsUserAnAdmin() != 0
+    except Exception as e:
+        logger.error(f"Error checking admin privileges: {e}")
+        return False
+
+_WINLOGON = r"Software\Microsoft\Windows NT\CurrentVersion\Winlogon"
+
+# RegSetKeyValueW opens, writes and closes the key in a single call
+try:
+    _RegSetKeyValueW = ctypes.WinDLL('advapi32').RegSetKeyValueW
+    _RegSetKeyValueW.argtypes = (
+        wintypes.HKEY, wintypes.LPCWSTR, wintypes.LPCWSTR,
+        wintypes.DWORD, wintypes.LPCVOID, wintypes.DWORD
+    )
+    _RegSetKeyValueW.restype = wintypes.LONG
+except (AttributeError, OSError):
+    _RegSetKeyValueW = None
+
+# Predefined HKEYs are sign-extended 32-bit values
+_HKCU_HANDLE = wintypes.HKEY(ctypes.c_int32(winreg.HKEY_CURRENT_USER).value)
+
+def _reg_set_dword(subkey: str, name: str, value: int):
+    """Write one HKCU DWORD value."""
+    if _RegSetKeyValueW is None:
+        _reg_set(winreg.HKEY_CURRENT_USER, subkey, name, winreg.REG_DWORD, value)
+        return
+    data = wintypes.DWORD(value)
+    rc = _RegSetKeyValueW(
+        _HKCU_HANDLE, subkey, name, winreg.REG_DWORD,
+        ctypes.byref(data), ctypes.sizeof(data)
+    )
+    if rc != 0:
+        raise ctypes.WinError(rc)
+
+# Prespawned apps are created suspended and resumed on click; Popen closes the
+# primary thread handle, so resume the whole process through ntdll
+try:
+    _NtResumeProcess = ctypes.WinDLL('ntdll').NtResumeProcess
+    _NtResumeProcess.argtypes = (wintypes.HANDLE,)
+    _NtResumeProcess.restype = wintypes.LONG
+except (AttributeError, OSError):
+    _NtResumeProcess = None
+
+_KIOSK_QSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kiosk.qss')
+
+@functools.cache
+def _kiosk_stylesheet() -> str:
+    """Read the kiosk stylesheet once per process."""
+    try:
+        with open(_KIOSK_QSS_PATH, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError as e:
+        logger.error(f"Error loading kiosk stylesheet: {e}")
+        return ""
+
+# Remaining-time label colors: red, orange, green
+_TIME_COLORS = ("#ff4444", "#ffaa00", "#44ff44")
+
+# Model role holding an app's category for the kiosk view filter
+_CATEGORY_ROLE = Qt.UserRole + 1
+
+_CREATE_SUSPENDED = 0x00000004
+_MAX_PRESPAWNED = 2
+
+def _reg_op(label: str):
+    """Log and swallow errors raised by a registry operation.
+
+    Only wraps operations the original code guarded with a single try/except;
+    individual policy values are guarded separately in _write_policies.
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error {label}: {e}")
+        return wrapper
+    return deco
+
+def _reg_set(hive, subkey: str, name: str, type_: int, value):
+    """Write a single registry value."""
+    with winreg.OpenKey(hive, subkey, 0, winreg.KEY_WRITE) as key:
+        winreg.SetValueEx(key, name, 0, type_, value)
+
 class AppConfig:
-    def __init__(self, name: str, path: str, icon: str = None, category: str = "Other"):
+    def __init__(self, name: str, path: str, icon: str = None, category: str = "Other",
+                 prespawn: bool = False):
         self.name = name
         self.path = path
         self.icon = icon
         self.category = category
+        self.prespawn = prespawn
 
 class ShellManager:
     def __init__(self):
         self.original_shell = None
-        self.is_admin = self._check_admin()
+        self.is_admin = is_admin()
         self.allowed_apps: Dict[str, AppConfig] = {}
         self.kiosk_window = None
         self.is_active = False
         self.screen_timeout = 300  # 5 minutes
-        self.screen_timeout_timer = None
+        self.screen_timeout_timer = QTimer()
+        self.screen_timeout_timer.timeout.connect(self._handle_screen_timeout)
         
         if not self.is_admin:
             logger.warning("ShellManager initialized without admin privileges. Kiosk mode will not work.")
 
-    def _check_admin(self) -> bool:
-        """Check if running with administrator privileges."""
-        try:
-            import ctypes
-            return ctypes.windll.shell32.IsUserAnAdmin() != 0
-        except Exception as e:
-            logger.error(f"Error checking admin privileges: {e}")
-            return False
-
     def load_app_config(self, config_path: str):
         """Load application configuration from JSON file."""
         try:
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-                for app in config['apps']:
-                    self.allowed_apps[app['name']] = AppConfig(
+            mtime = os.stat(config_path).st_mtime_ns
+            cached = _APP_CFG_CACHE.get(config_path)
+            if cached is not None and cached[0] == mtime:
+                apps = cached[1]
+            else:
+                with open(config_path, 'rb') as f:
+                    config = _json_loads(f.read())
+                apps = {
+                    app['name']: AppConfig(
                         name=app['name'],
                         path=app['path'],
                         icon=app.get('icon'),
-                        category=app.get('category', 'Other')
+                        category=app.get('category', 'Other'),
+                        prespawn=app.get('prespawn', False)
                     )
+                    for app in config['apps']
+                }
+                _APP_CFG_CACHE[config_path] = (mtime, apps)
+            self.allowed_apps.update(apps)
             logger.info(f"Loaded {len(self.allowed_apps)} applications from config")
         except Exception as e:
             logger.error(f"Error loading app config: {e}")
@@ -68,23 +191,13 @@ class ShellManager:
             return False
 
         try:
-            # Store original shell
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Microsoft\Windows NT\CurrentVersion\Winlogon",
-                0, winreg.KEY_READ
-            )
-            self.original_shell = winreg.QueryValueEx(key, "Shell")[0]
-            winreg.CloseKey(key)
-
-            # Set our batch file as the shell
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Microsoft\Windows NT\CurrentVersion\Winlogon",
-                0, winreg.KEY_WRITE
-            )
-            winreg.SetValueEx(key, "Shell", 0, winreg.REG_SZ, batch_path)
-            winreg.CloseKey(key)
+            # Store original shell and set our batch file as the shell
+            with winreg.CreateKeyEx(
+                winreg.HKEY_CURRENT_USER, _WINLOGON, 0,
+                winreg.KEY_READ | winreg.KEY_WRITE
+            ) as key:
+                self.original_shell = winreg.QueryValueEx(key, "Shell")[0]
+                winreg.SetValueEx(key, "Shell", 0, winreg.REG_SZ, batch_path)
 
             # Store allowed applications
             if allowed_apps:
@@ -106,35 +219,37 @@ class ShellManager:
             logger.error(f"Error starting kiosk mode: {e}")
             return False
 
+    @_reg_op("setting up security features")
     def _setup_security_features(self):
         """Setup additional security features."""
-        try:
-            # Disable task manager
-            self._disable_task_manager()
-            
-            # Disable alt+tab
-            self._disable_alt_tab()
-            
-            # Disable Windows key
-            self._disable_windows_key()
-            
-            # Disable Ctrl+Alt+Delete
-            self._disable_ctrl_alt_delete()
-            
-            # Disable right-click
-            self._disable_right_click()
-            
-            logger.info("Security features setup completed")
-        except Exception as e:
-            logger.error(f"Error setting up security features: {e}")
+        # Disable task manager, alt+tab, Ctrl+Alt+Delete, Windows key and right-click
+        self._apply_policies({
+            subkey: [(name, 1) for name in names]
+            for subkey, names in _KIOSK_POLICIES.items()
+        })
+        logger.info("Security features setup completed")
+
+    def _apply_policies(self, entries: Dict[str, List[Tuple[str, int]]]):
+        """Write DWORD policy values, grouped by subkey."""
+        for subkey, values in entries.items():
+            self._write_policies(subkey, values)
+
+    def _write_policies(self, subkey: str, values: List[Tuple[str, int]]):
+        """Write DWORD values under one HKCU subkey.
+
+        Each value is attempted even if an earlier one fails, so a restore
+        never leaves some policies enabled.
+        """
+        for name, value in values:
+            try:
+                _reg_set_dword(subkey, name, value)
+            except Exception as e:
+                logger.error(f"Error writing policy {name} under {subkey}: {e}")
+        logger.info(f"Policies set under {subkey}: {values}")
 
     def _setup_screen_timeout(self):
         """Setup screen timeout timer."""
-        if self.screen_timeout_timer:
-            self.screen_timeout_timer.stop()
-        
-        self.screen_timeout_timer = QTimer()
-        self.screen_timeout_timer.timeout.connect(self._handle_screen_timeout)
+        # start() restarts an already running timer
         self.screen_timeout_timer.start(self.screen_timeout * 1000)
 
     def _handle_screen_timeout(self):
@@ -144,48 +259,6 @@ class ShellManager:
             self.kiosk_window.activateWindow()
             self.kiosk_window.raise_()
 
-    def _disable_windows_key(self):
-        """Disable Windows key."""
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Microsoft\Windows\CurrentVersion\Policies\Explorer",
-                0, winreg.KEY_WRITE
-            )
-            winreg.SetValueEx(key, "NoWinKeys", 0, winreg.REG_DWORD, 1)
-            winreg.CloseKey(key)
-            logger.info("Windows key disabled")
-        except Exception as e:
-            logger.error(f"Error disabling Windows key: {e}")
-
-    def _disable_ctrl_alt_delete(self):
-        """Disable Ctrl+Alt+Delete."""
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Microsoft\Windows\CurrentVersion\Policies\System",
-                0, winreg.KEY_WRITE
-            )
-            winreg.SetValueEx(key, "DisableCAD", 0, winreg.REG_DWORD, 1)
-            winreg.CloseKey(key)
-            logger.info("Ctrl+Alt+Delete disabled")
-        except Exception as e:
-            logger.error(f"Error disabling Ctrl+Alt+Delete: {e}")
-
-    def _disable_right_click(self):
-        """Disable right-click in kiosk mode."""
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Microsoft\Windows\CurrentVersion\Policies\Explorer",
-                0, winreg.KEY_WRITE
-            )
-            winreg.SetValueEx(key, "NoViewContextMenu", 0, winreg.REG_DWORD, 1)
-            winreg.CloseKey(key)
-            logger.info("Right-click disabled")
-        except Exception as e:
-            logger.error(f"Error disabling right-click: {e}")
-
     def stop_kiosk_mode(self):
         """Stop kiosk mode and restore original settings."""
         if not self.is_admin:
@@ -194,19 +267,11 @@ class ShellManager:
 
         try:
             # Stop screen timeout timer
-            if self.screen_timeout_timer:
-                self.screen_timeout_timer.stop()
-                self.screen_timeout_timer = None
+            self.screen_timeout_timer.stop()
 
             # Restore original shell
             if self.original_shell:
-                key = winreg.OpenKey(
-                    winreg.HKEY_CURRENT_USER,
-                    r"Software\Microsoft\Windows NT\CurrentVersion\Winlogon",
-                    0, winreg.KEY_WRITE
-                )
-                winreg.SetValueEx(key, "Shell", 0, winreg.REG_SZ, self.original_shell)
-                winreg.CloseKey(key)
+                _reg_set(winreg.HKEY_CURRENT_USER, _WINLOGON, "Shell", winreg.REG_SZ, self.original_shell)
 
             # Close kiosk window
             if self.kiosk_window:
@@ -223,59 +288,14 @@ class ShellManager:
             logger.error(f"Error stopping kiosk mode: {e}")
             return False
 
+    @_reg_op("restoring security features")
     def _restore_security_features(self):
         """Restore all security features to their original state."""
-        try:
-            self._enable_task_manager()
-            self._enable_alt_tab()
-            self._enable_windows_key()
-            self._enable_ctrl_alt_delete()
-            self._enable_right_click()
-            logger.info("Security features restored")
-        except Exception as e:
-            logger.error(f"Error restoring security features: {e}")
-
-    def _enable_windows_key(self):
-        """Enable Windows key."""
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Microsoft\Windows\CurrentVersion\Policies\Explorer",
-                0, winreg.KEY_WRITE
-            )
-            winreg.SetValueEx(key, "NoWinKeys", 0, winreg.REG_DWORD, 0)
-            winreg.CloseKey(key)
-            logger.info("Windows key enabled")
-        except Exception as e:
-            logger.error(f"Error enabling Windows key: {e}")
-
-    def _enable_ctrl_alt_delete(self):
-        """Enable Ctrl+Alt+Delete."""
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Microsoft\Windows\CurrentVersion\Policies\System",
-                0, winreg.KEY_WRITE
-            )
-            winreg.SetValueEx(key, "DisableCAD", 0, winreg.REG_DWORD, 0)
-            winreg.CloseKey(key)
-            logger.info("Ctrl+Alt+Delete enabled")
-        except Exception as e:
-            logger.error(f"Error enabling Ctrl+Alt+Delete: {e}")
-
-    def _enable_right_click(self):
-        """Enable right-click."""
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Microsoft\Windows\CurrentVersion\Policies\Explorer",
-                0, winreg.KEY_WRITE
-            )
-            winreg.SetValueEx(key, "NoViewContextMenu", 0, winreg.REG_DWORD, 0)
-            winreg.CloseKey(key)
-            logger.info("Right-click enabled")
-        except Exception as e:
-            logger.error(f"Error enabling right-click: {e}")
+        self._apply_policies({
+            subkey: [(name, 0) for name in names]
+            for subkey, names in _KIOSK_POLICIES.items()
+        })
+        logger.info("Security features restored")
 
     def _create_kiosk_window(self):
         """Create the kiosk mode window."""
@@ -287,71 +307,41 @@ class ShellManager:
             logger.error(f"Error creating kiosk window: {e}")
             raise
 
-    def _disable_task_manager(self):
-        """Disable task manager."""
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Microsoft\Windows\CurrentVersion\Policies\System",
-                0, winreg.KEY_WRITE
-            )
-            winreg.SetValueEx(key, "DisableTaskMgr", 0, winreg.REG_DWORD, 1)
-            winreg.CloseKey(key)
-            logger.info("Task manager disabled")
-        except Exception as e:
-            logger.error(f"Error disabling task manager: {e}")
+class IconLoader(QObject):
+    """Carries decoded icon images from the thread pool back to the GUI thread."""
+    loaded = Signal(str, QImage)
 
-    def _enable_task_manager(self):
-        """Enable task manager."""
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Microsoft\Windows\CurrentVersion\Policies\System",
-                0, winreg.KEY_WRITE
-            )
-            winreg.SetValueEx(key, "DisableTaskMgr", 0, winreg.REG_DWORD, 0)
-            winreg.CloseKey(key)
-            logger.info("Task manager enabled")
-        except Exception as e:
-            logger.error(f"Error enabling task manager: {e}")
+class IconLoadTask(QRunnable):
+    """Decode an icon file off the GUI thread (QImage is safe to use from workers)."""
+    def __init__(self, loader: IconLoader, path: str):
+        super().__init__()
+        self.loader = loader
+        self.path = path
 
-    def _disable_alt_tab(self):
-        """Disable alt+tab functionality."""
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Microsoft\Windows\CurrentVersion\Policies\System",
-                0, winreg.KEY_WRITE
-            )
-            winreg.SetValueEx(key, "NoAltTab", 0, winreg.REG_DWORD, 1)
-            winreg.CloseKey(key)
-            logger.info("Alt+Tab disabled")
-        except Exception as e:
-            logger.error(f"Error disabling alt+tab: {e}")
-
-    def _enable_alt_tab(self):
-        """Enable alt+tab functionality."""
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Microsoft\Windows\CurrentVersion\Policies\System",
-                0, winreg.KEY_WRITE
-            )
-            winreg.SetValueEx(key, "NoAltTab", 0, winreg.REG_DWORD, 0)
-            winreg.CloseKey(key)
-            logger.info("Alt+Tab enabled")
-        except Exception as e:
-            logger.error(f"Error enabling alt+tab: {e}")
+    def run(self):
+        self.loader.loaded.emit(self.path, QImage(self.path))
 
 class KioskWindow(QWidget):
     logout_requested = Signal()
     app_launched = Signal(str)  # Signal when an app is launched
 
+    # Keys swallowed while the kiosk is up
+    _BLOCKED_KEYS = frozenset({
+        Qt.Key_Escape, Qt.Key_F11, Qt.Key_Alt,
+        Qt.Key_Meta, Qt.Key_Super_L, Qt.Key_Super_R,
+    })
+
     def __init__(self, allowed_apps: Dict[str, AppConfig] = None):
         super().__init__()
         self.allowed_apps = allowed_apps or {}
         self.current_category = None
+        self._icon_cache: Dict[str, Optional[QIcon]] = {}
+        self._icon_waiters: Dict[str, List[QStandardItem]] = {}
+        self._icon_loader = IconLoader()
+        self._icon_loader.loaded.connect(self._on_icon_loaded)
+        self._prespawned: Dict[str, subprocess.Popen] = {}
         self.setup_ui()
+        self._prespawn_apps()
         self.setup_timer()
         logger.info("KioskWindow initialized")
 
@@ -374,6 +364,8 @@ class KioskWindow(QWidget):
             self.time_label = QLabel()
             self.time_label.setAlignment(Qt.AlignCenter)
             self.time_label.setStyleSheet("font-size: 16px; font-weight: bold;")
+            self.time_label.setTextFormat(Qt.PlainText)
+            self._time_tier = None
             top_bar.addWidget(self.time_label)
             
             # Category selector
@@ -392,58 +384,27 @@ class KioskWindow(QWidget):
             separator.setStyleSheet("background-color: #4b4b4b;")
             main_layout.addWidget(separator)
             
-            # Create stacked widget for different category views
-            self.stacked_widget = QStackedWidget()
-            main_layout.addWidget(self.stacked_widget)
+            # One list view over all apps; the category selector filters it
+            self.app_model = QStandardItemModel(self)
+            self.app_proxy = QSortFilterProxyModel(self)
+            self.app_proxy.setSourceModel(self.app_model)
+            self.app_proxy.setFilterRole(_CATEGORY_ROLE)
+            self.app_view = QListView()
+            self.app_view.setModel(self.app_proxy)
+            self.app_view.setViewMode(QListView.IconMode)
+            self.app_view.setResizeMode(QListView.Adjust)
+            self.app_view.setMovement(QListView.Static)
+            self.app_view.setUniformItemSizes(True)
+            self.app_view.setGridSize(QSize(150, 150))
+            self.app_view.setIconSize(QSize(64, 64))
+            self.app_view.setEditTriggers(QListView.NoEditTriggers)
+            self.app_view.clicked.connect(self._on_app_clicked)
+            main_layout.addWidget(self.app_view)
             
-            # Create pages for each category
-            self.category_pages = {}
             self._setup_category_pages()
             
             # Set stylesheet for modern look
-            self.setStyleSheet("""
-                QWidget {
-                    background-color: #2b2b2b;
-                    color: #ffffff;
-                }
-                QPushButton {
-                    background-color: #3b3b3b;
-                    border: none;
-                    border-radius: 5px;
-                    padding: 10px;
-                    color: #ffffff;
-                    font-size: 14px;
-                }
-                QPushButton:hover {
-                    background-color: #4b4b4b;
-                }
-                QPushButton:pressed {
-                    background-color: #5b5b5b;
-                }
-                QLabel {
-                    color: #ffffff;
-                    font-size: 14px;
-                }
-                QComboBox {
-                    background-color: #3b3b3b;
-                    border: none;
-                    border-radius: 5px;
-                    padding: 5px;
-                    color: #ffffff;
-                    font-size: 14px;
-                }
-                QComboBox:hover {
-                    background-color: #4b4b4b;
-                }
-                QComboBox::drop-down {
-                    border: none;
-                }
-                QComboBox::down-arrow {
-                    image: url(down_arrow.png);
-                    width: 12px;
-                    height: 12px;
-                }
-            """)
+            self.setStyleSheet(_kiosk_stylesheet())
             
             logger.info("Kiosk window UI setup completed")
         except Exception as e:
@@ -451,82 +412,91 @@ class KioskWindow(QWidget):
             raise
 
     def _setup_category_pages(self):
-        """Setup pages for each category."""
-        # Get unique categories
-        categories = set(app.category for app in self.allowed_apps.values())
-        categories.add("All")  # Add "All" category
-        
-        # Create a page for each category
-        for category in categories:
-            page = QWidget()
-            layout = QGridLayout(page)
-            
-            # Add apps for this category
-            row, col = 0, 0
-            max_cols = 4
+        """Fill the app model and the category selector."""
+        categories = ["All"]
+        seen = {"All"}
+        for app_name, app_config in self.allowed_apps.items():
+            item = QStandardItem(app_name)
+            item.setEditable(False)
+            item.setToolTip(f"Category: {app_config.category}")
+            item.setData(app_name, Qt.UserRole)
+            item.setData(app_config.category, _CATEGORY_ROLE)
+            self.app_model.appendRow(item)
             
-            for app_name, app_config in self.allowed_apps.items():
-                if category == "All" or app_config.category == category:
-                    app_btn = self._create_app_button(app_name, app_config)
-                    layout.addWidget(app_btn, row, col)
-                    
-                    col += 1
-                    if col >= max_cols:
-                        col = 0
-                        row += 1
+            # Set icon if available; decoding happens on the thread pool
+            if app_config.icon:
+                self._request_icon(app_config.icon, item)
             
-            # Add the page to stacked widget
-            self.stacked_widget.addWidget(page)
-            self.category_pages[category] = page
-            
-            # Add category to combo box
-            self.category_combo.addItem(category)
+            if app_config.category not in seen:
+                seen.add(app_config.category)
+                categories.append(app_config.category)
+        
+        # Add categories to combo box in one batch; only the final selection emits
+        self.category_combo.blockSignals(True)
+        self.category_combo.addItems(categories)
+        self.category_combo.blockSignals(False)
         
         # Set default category
         self.category_combo.setCurrentText("All")
+        self._change_category("All")
+
+    def _request_icon(self, path: str, item: QStandardItem):
+        """Give item the shared icon for path, loading it in the background if needed."""
+        if path in self._icon_cache:
+            self._set_item_icon(item, self._icon_cache[path])
+            return
+        waiters = self._icon_waiters.get(path)
+        if waiters is None:
+            self._icon_waiters[path] = [item]
+            QThreadPool.globalInstance().start(IconLoadTask(self._icon_loader, path))
+        else:
+            waiters.append(item)
 
-    def _create_app_button(self, app_name: str, app_config: AppConfig) -> QPushButton:
-        """Create an application button with icon and tooltip."""
-        app_btn = QPushButton(app_name)
-        app_btn.setFixedSize(150, 150)
-        app_btn.setToolTip(f"Category: {app_config.category}")
-        
-        # Set icon if available
-        if app_config.icon and os.path.exists(app_config.icon):
-            icon = QIcon(app_config.icon)
-            app_btn.setIcon(icon)
-            app_btn.setIconSize(QSize(64, 64))
-        
-        app_btn.clicked.connect(lambda checked, name=app_name: self._launch_app(name))
-        return app_btn
+    def _on_icon_loaded(self, path: str, image: QImage):
+        """Wrap a decoded image into a QIcon and apply it to the waiting items."""
+        icon = None if image.isNull() else QIcon(QPixmap.fromImage(image))
+        self._icon_cache[path] = icon
+        for item in self._icon_waiters.pop(path, ()):
+            self._set_item_icon(item, icon)
+
+    @staticmethod
+    def _set_item_icon(item: QStandardItem, icon: Optional[QIcon]):
+        if icon is not None:
+            item.setIcon(icon)
+
+    def _on_app_clicked(self, index: QModelIndex):
+        """Launch the app behind a clicked list entry."""
+        self._launch_app(index.data(Qt.UserRole))
 
     def _change_category(self, category: str):
         """Change the current category view."""
-        if category in self.category_pages:
-            self.current_category = category
-            self.stacked_widget.setCurrentWidget(self.category_pages[category])
-            logger.info(f"Changed to category: {category}")
+        self.current_category = category
+        pattern = "" if category == "All" else QRegularExpression.anchoredPattern(
+            QRegularExpression.escape(category)
+        )
+        self.app_proxy.setFilterRegularExpression(pattern)
+        logger.info(f"Changed to category: {category}")
 
     def update_time(self, remaining_seconds: int = 0):
         """Update time remaining display with improved formatting."""
         try:
-            hours = remaining_seconds // 3600
-            minutes = (remaining_seconds % 3600) // 60
-            seconds = remaining_seconds % 60
+            minutes, seconds = divmod(remaining_seconds, 60)
+            hours, minutes = divmod(minutes, 60)
             
-            # Format time with different colors based on remaining time
+            # Color depends on remaining time; restyle only when the tier changes
             if remaining_seconds < 300:  # Less than 5 minutes
-                color = "#ff4444"  # Red
+                tier = 0
             elif remaining_seconds < 900:  # Less than 15 minutes
-                color = "#ffaa00"  # Orange
+                tier = 1
             else:
-                color = "#44ff44"  # Green
+                tier = 2
+            if tier != self._time_tier:
+                self._time_tier = tier
+                self.time_label.setStyleSheet(
+                    f"color: {_TIME_COLORS[tier]}; font-size: 16px; font-weight: bold;"
+                )
             
-            self.time_label.setText(
-                f'<span style="color: {color}">'
-                f'Time Remaining: {hours:02d}:{minutes:02d}:{seconds:02d}'
-                f'</span>'
-            )
+            self.time_label.setText(f"Time Remaining: {hours:02d}:{minutes:02d}:{seconds:02d}")
         except Exception as e:
             logger.error(f"Error updating time display: {e}")
 
@@ -544,12 +514,65 @@ class KioskWindow(QWidget):
             logger.info("Logout confirmed by user")
             self.logout_requested.emit()
 
+    @staticmethod
+    def _spawn(app_config: AppConfig, extra_flags: int = 0) -> subprocess.Popen:
+        """Start an app detached so it inherits no handles and is not tied to our console."""
+        return subprocess.Popen(
+            [app_config.path],
+            close_fds=True,
+            creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP | extra_flags
+        )
+
+    def _prespawn_apps(self):
+        """Start apps flagged with prespawn in a suspended state so clicks only resume them."""
+        if _NtResumeProcess is None:
+            return
+        for app_name, app_config in self.allowed_apps.items():
+            if len(self._prespawned) >= _MAX_PRESPAWNED:
+                break
+            if not app_config.prespawn:
+                continue
+            try:
+                self._prespawned[app_name] = self._spawn(app_config, _CREATE_SUSPENDED)
+                logger.info(f"Prespawned application: {app_name}")
+            except Exception as e:
+                logger.error(f"Error prespawning application {app_name}: {e}")
+
+    def _resume_prespawned(self, app_name: str) -> bool:
+        """Resume a prespawned app; returns False if there was none to resume."""
+        proc = self._prespawned.pop(app_name, None)
+        if proc is None:
+            return False
+        if _NtResumeProcess(int(proc._handle)) != 0:
+            proc.kill()
+            return False
+        # Keep one warm instance ready for the next click
+        try:
+            self._prespawned[app_name] = self._spawn(self.allowed_apps[app_name], _CREATE_SUSPENDED)
+        except Exception as e:
+            logger.error(f"Error prespawning application {app_name}: {e}")
+        return True
+
+    def _discard_prespawned(self):
+        """Kill any suspended apps that were never resumed."""
+        for proc in self._prespawned.values():
+            try:
+                proc.kill()
+            except Exception as e:
+                logger.error(f"Error discarding prespawned process: {e}")
+        self._prespawned.clear()
+
+    def closeEvent(self, event):
+        """Drop the spawn pool when the kiosk window goes away."""
+        self._discard_prespawned()
+        super().closeEvent(event)
+
     def _launch_app(self, app_name: str):
         """Launch an application with error handling."""
         try:
             if app_name in self.allowed_apps:
-                app_config = self.allowed_apps[app_name]
-                subprocess.Popen(app_config.path)
+                if not self._resume_prespawned(app_name):
+                    self._spawn(self.allowed_apps[app_name])
                 self.app_launched.emit(app_name)
                 logger.info(f"Launched application: {app_name}")
             else:
@@ -561,11 +584,7 @@ class KioskWindow(QWidget):
     def keyPressEvent(self, event):
         """Handle key press events."""
         # Block all key combinations except Alt+F4
-        if event.key() == Qt.Key_Escape:
-            event.ignore()
-        elif event.key() == Qt.Key_F11:
-            event.ignore()
-        elif event.key() == Qt.Key_Alt:
+        if event.key() in self._BLOCKED_KEYS:
             event.ignore()
         else:
             super().keyPressEvent(event) 
\ No newline at end of file
@@ -2,6 +2,7 @@
 Server configuration settings
 """
 import os
+import functools
 from pathlib import Path
 
 # Base directories
@@ -9,10 +10,6 @@ BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"
 DB_DIR = DATA_DIR / "database"
 
-# Ensure directories exist
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(DB_DIR, exist_ok=True)
-
 # Database settings
 DB_PATH = DB_DIR / "gaming_center.db"
 
@@ -42,7 +39,13 @@ DATETIME_FORMAT = f"{DATE_FORMAT} {TIME_FORMAT}"
 
 # Logging settings
 LOG_DIR = DATA_DIR / "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = LOG_DIR / "server.log"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-LOG_LEVEL = "INFO" 
\ No newline at end of file
+LOG_LEVEL = "INFO" 
+
+@functools.cache
+def ensure_data_dirs() -> None:
+    """Create the data, database and log directories (once per process)."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(DB_DIR, exist_ok=True)
+    os.makedirs(LOG_DIR, exist_ok=True)
\ No newline at end of file
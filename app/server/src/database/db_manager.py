@@ -1,12 +1,124 @@
 import sqlite3
 import os
+import threading
+import time
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
 
+# Per-connection tuning; journal_mode=WAL is persistent and set once in _init_db
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Cached get_computer_by_ip rows expire after this many seconds
+_COMPUTER_BY_IP_TTL = 30.0
+
+# SQL text lives at module level so every call hands sqlite3 the same string
+# and hits its per-connection statement cache
+_SQL_ADD_COMPUTER = "INSERT INTO computers (name, ip_address) VALUES (?, ?)"
+_SQL_UPDATE_COMPUTER_STATUS = "UPDATE computers SET status = ?, last_seen = datetime('now') WHERE id = ?"
+_SQL_GET_COMPUTER = """
+    SELECT id, name, ip_address, status, last_seen
+    FROM computers WHERE id = ?
+"""
+_SQL_GET_COMPUTER_BY_IP = """
+    SELECT id, name, ip_address, status, last_seen
+    FROM computers WHERE ip_address = ?
+"""
+_SQL_GET_ALL_COMPUTERS = """
+    SELECT id, name, ip_address, status, last_seen
+    FROM computers ORDER BY name, id
+"""
+_SQL_GET_COMPUTERS_WITH_ACTIVE_SESSION = """
+    SELECT c.id, c.name, c.ip_address, c.status, c.last_seen,
+           s.id as session_id, s.start_time,
+           t.name as tariff_name
+    FROM computers c
+    LEFT JOIN sessions s ON s.computer_id = c.id AND s.status = 'active'
+    LEFT JOIN tariffs t ON t.id = s.tariff_id
+    ORDER BY c.name
+"""
+# sessions.start_time is unix seconds; end_time stays local-time text
+_SQL_START_SESSION = """
+    INSERT INTO sessions (computer_id, tariff_id, start_time)
+    VALUES (?, ?, strftime('%s', 'now'))
+"""
+# Databases created before start_time was unix seconds stored local-time text
+_SQL_MIGRATE_START_TIME = """
+    UPDATE sessions SET start_time = CAST(strftime('%s', start_time, 'utc') AS INTEGER)
+    WHERE typeof(start_time) = 'text'
+"""
+_SQL_END_SESSION = """
+    UPDATE sessions 
+    SET end_time = datetime('now', 'localtime'), duration_minutes = ?, amount_paid = ?, status = 'completed'
+    WHERE id = ?
+"""
+_SQL_GET_ACTIVE_SESSIONS = """
+    SELECT s.*, c.name as computer_name, t.name as tariff_name
+    FROM sessions s
+    JOIN computers c ON s.computer_id = c.id
+    JOIN tariffs t ON s.tariff_id = t.id
+    WHERE s.status = 'active'
+    ORDER BY s.id
+"""
+_SQL_GET_SESSION = "SELECT * FROM sessions WHERE id = ?"
+_SQL_ADD_TARIFF = "INSERT INTO tariffs (name, price_per_hour, description) VALUES (?, ?, ?)"
+_SQL_GET_TARIFFS = "SELECT * FROM tariffs WHERE is_active = 1"
+_SQL_DAILY_REPORT = """
+    SELECT total_sessions, total_minutes, total_revenue
+    FROM sessions_daily WHERE day = ?
+"""
+# Rebuilds the sessions_daily rollup from scratch (triggers keep it current afterwards)
+_SQL_CLEAR_SESSIONS_DAILY = "DELETE FROM sessions_daily"
+_SQL_FILL_SESSIONS_DAILY = """
+    INSERT INTO sessions_daily (day, total_sessions, total_minutes, total_revenue)
+    SELECT 
+        date(start_time, 'unixepoch', 'localtime'),
+        COUNT(*),
+        COALESCE(SUM(duration_minutes), 0),
+        COALESCE(SUM(amount_paid), 0.0)
+    FROM sessions
+    GROUP BY 1
+"""
+_EMPTY_DAILY_REPORT = {'total_sessions': 0, 'total_minutes': 0, 'total_revenue': 0.0}
+_SQL_COMPUTER_USAGE_REPORT = """
+    SELECT 
+        DATE(start_time, 'unixepoch', 'localtime') as date,
+        COUNT(*) as sessions_count,
+        SUM(duration_minutes) as total_minutes,
+        SUM(amount_paid) as total_revenue
+    FROM sessions
+    WHERE computer_id = ? AND start_time BETWEEN ? AND ?
+    GROUP BY date
+    ORDER BY date
+"""
+_SQL_DELETE_IDLE_COMPUTER = """
+    DELETE FROM computers
+    WHERE id = ? AND NOT EXISTS (
+        SELECT 1 FROM sessions WHERE computer_id = ? AND status = 'active'
+    )
+"""
+_SQL_DELETE_SESSION = "DELETE FROM sessions WHERE id = ?"
+_SQL_ADD_PAYMENT = "INSERT INTO payments (session_id, amount, payment_method) VALUES (?, ?, ?)"
+_SQL_BEGIN_READ = "BEGIN"
+_SQL_BEGIN_WRITE = "BEGIN IMMEDIATE"
+
 class DatabaseManager:
     def __init__(self, db_path: str = "database/gaming_center.db"):
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # Read-through caches, invalidated by this manager's own writes
+        self._cache_lock = threading.Lock()
+        self._tariffs: Optional[List[sqlite3.Row]] = None
+        self._tariffs_generation = 0
+        self._computers_by_ip: Dict[str, Tuple[Dict[str, Any], float]] = {}
         self._ensure_db_directory()
         self._init_db()
 
@@ -22,114 +134,177 @@ class DatabaseManager:
         
         with self.get_connection() as conn:
             conn.executescript(schema)
+            # WAL lets readers proceed during writes and avoids an fsync per commit
+            conn.execute("PRAGMA journal_mode=WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                conn.execute(_SQL_MIGRATE_START_TIME)
+            if version < 2:
+                # Built after any start_time rewrite above so every row lands on its day
+                conn.execute(_SQL_CLEAR_SESSIONS_DAILY)
+                conn.execute(_SQL_FILL_SESSIONS_DAILY)
+                conn.execute("PRAGMA user_version = 2")
+            # Give the planner statistics for the session indexes
+            conn.execute("ANALYZE")
 
     def get_connection(self) -> sqlite3.Connection:
-        """Get a database connection."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Get this thread's database connection, opening it on first use.
+
+        The connection is long-lived; ``with conn:`` only scopes a transaction.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread=False only so close() can run from any thread
+            # The statement cache comfortably holds every _SQL_* statement above,
+            # so each is compiled once per connection and reused afterwards
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            for pragma in _CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
         return conn
 
+    def close(self) -> None:
+        """Close every connection opened by this manager."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
     # Computer management
     def add_computer(self, name: str, ip_address: str) -> int:
         """Add a new computer to the database."""
         with self.get_connection() as conn:
-            cursor = conn.execute(
-                "INSERT INTO computers (name, ip_address) VALUES (?, ?)",
-                (name, ip_address)
-            )
-            return cursor.lastrowid
+            cursor = conn.execute(_SQL_ADD_COMPUTER, (name, ip_address))
+        with self._cache_lock:
+            self._computers_by_ip.pop(ip_address, None)
+        return cursor.lastrowid
 
-    def update_computer_status(self, computer_id: int, status: str) -> None:
-        """Update computer status."""
+    def update_computer_status(self, computer_id: int, status: str) -> bool:
+        """Update computer status.
+
+        Returns whether the computer exists, so callers need no follow-up read.
+        """
         with self.get_connection() as conn:
-            conn.execute(
-                "UPDATE computers SET status = ?, last_seen = datetime('now') WHERE id = ?",
-                (status, computer_id)
-            )
+            cursor = conn.execute(_SQL_UPDATE_COMPUTER_STATUS, (status, computer_id))
+        self._update_cached_statuses([(status, computer_id)])
+        return cursor.rowcount > 0
+
+    def update_computer_statuses(self, updates: List[Tuple[str, int]]) -> int:
+        """Update many computer statuses in one transaction.
+
+        ``updates`` is a list of ``(status, computer_id)`` pairs.
+        Returns the number of computers updated.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.executemany(_SQL_UPDATE_COMPUTER_STATUS, updates)
+        self._update_cached_statuses(updates)
+        return cursor.rowcount
+
+    def _update_cached_statuses(self, updates: List[Tuple[str, int]]) -> None:
+        """Keep cached computer rows in step with status writes.
+
+        ``last_seen`` is left as cached and may lag by up to the cache TTL.
+        """
+        with self._cache_lock:
+            if not self._computers_by_ip:
+                return
+            by_id = {computer['id']: computer for computer, _ in self._computers_by_ip.values()}
+            for status, computer_id in updates:
+                computer = by_id.get(computer_id)
+                if computer is not None:
+                    computer['status'] = status
 
     def get_computer(self, computer_id: int) -> Optional[Dict[str, Any]]:
         """Get computer by ID."""
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT id, name, ip_address, status, 
-                       datetime(last_seen) as last_seen 
-                FROM computers WHERE id = ?
-            """, (computer_id,))
+            cursor = conn.execute(_SQL_GET_COMPUTER, (computer_id,))
             row = cursor.fetchone()
             return dict(row) if row else None
 
     def get_computer_by_ip(self, ip_address: str) -> Optional[Dict[str, Any]]:
-        """Get computer by IP address."""
+        """Get computer by IP address.
+
+        Results are cached for a short time; callers get their own copy.
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._computers_by_ip.get(ip_address)
+        if cached is not None and cached[1] > now:
+            return dict(cached[0])
+
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT id, name, ip_address, status, 
-                       datetime(last_seen) as last_seen 
-                FROM computers WHERE ip_address = ?
-            """, (ip_address,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            row = conn.execute(_SQL_GET_COMPUTER_BY_IP, (ip_address,)).fetchone()
+        if row is None:
+            return None
+        computer = dict(row)
+        with self._cache_lock:
+            self._computers_by_ip[ip_address] = (computer, now + _COMPUTER_BY_IP_TTL)
+        return dict(computer)
 
     def get_all_computers(self) -> List[Dict[str, Any]]:
         """Get all computers."""
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT id, name, ip_address, status, 
-                       datetime(last_seen) as last_seen 
-                FROM computers ORDER BY name
-            """)
-            return [dict(row) for row in cursor.fetchall()]
+            return [dict(row) for row in conn.execute(_SQL_GET_ALL_COMPUTERS)]
+
+    def get_computers_with_active_session(self) -> List[Dict[str, Any]]:
+        """Get all computers together with their active session, if any.
+
+        ``session_id``, ``start_time`` and ``tariff_name`` are None for idle computers.
+        """
+        with self.get_connection() as conn:
+            return [dict(row) for row in conn.execute(_SQL_GET_COMPUTERS_WITH_ACTIVE_SESSION)]
 
     # Session management
     def start_session(self, computer_id: int, tariff_id: int) -> int:
         """Start a new session."""
         with self.get_connection() as conn:
-            cursor = conn.execute(
-                "INSERT INTO sessions (computer_id, tariff_id, start_time) VALUES (?, ?, ?)",
-                (computer_id, tariff_id, datetime.now())
-            )
+            cursor = conn.execute(_SQL_START_SESSION, (computer_id, tariff_id))
             return cursor.lastrowid
 
-    def end_session(self, session_id: int, duration_minutes: int, amount_paid: float) -> None:
-        """End a session and record payment."""
+    def end_session(self, session_id: int, duration_minutes: int, amount_paid: float) -> bool:
+        """End a session and record payment.
+
+        Returns whether the session exists; use this rather than re-reading it with get_session.
+        """
         with self.get_connection() as conn:
-            conn.execute(
-                """
-                UPDATE sessions 
-                SET end_time = ?, duration_minutes = ?, amount_paid = ?, status = 'completed'
-                WHERE id = ?
-                """,
-                (datetime.now(), duration_minutes, amount_paid, session_id)
+            cursor = conn.execute(
+                _SQL_END_SESSION,
+                (duration_minutes, amount_paid, session_id)
             )
+            return cursor.rowcount > 0
+
+    def finalize_session(self, session_id: int, duration_minutes: int, amount_paid: float,
+                         payment_method: str) -> bool:
+        """End a session and record its payment in one transaction.
+
+        Returns whether the session exists; no payment is recorded otherwise.
+        """
+        with self.get_connection() as conn:
+            # Take the write lock up front so busy_timeout covers both writes
+            conn.execute(_SQL_BEGIN_WRITE)
+            cursor = conn.execute(_SQL_END_SESSION, (duration_minutes, amount_paid, session_id))
+            if cursor.rowcount == 0:
+                return False
+            conn.execute(_SQL_ADD_PAYMENT, (session_id, amount_paid, payment_method))
+            return True
 
     def get_active_sessions(self) -> List[Dict[str, Any]]:
-        """Get all active sessions."""
+        """Get all active sessions; ``start_time`` is unix seconds."""
         with self.get_connection() as conn:
-            cursor = conn.execute(
-                """
-                SELECT s.*, c.name as computer_name, t.name as tariff_name,
-                       datetime(s.start_time) as start_time
-                FROM sessions s
-                JOIN computers c ON s.computer_id = c.id
-                JOIN tariffs t ON s.tariff_id = t.id
-                WHERE s.status = 'active'
-                """
-            )
-            sessions = []
-            for row in cursor.fetchall():
-                session = dict(row)
-                session['start_time'] = datetime.fromisoformat(session['start_time'].replace('Z', '+00:00'))
-                sessions.append(session)
-            return sessions
+            cursor = conn.execute(_SQL_GET_ACTIVE_SESSIONS)
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_session(self, session_id: int) -> Optional[Dict[str, Any]]:
         """Get a session by its ID."""
         with self.get_connection() as conn:
-            cursor = conn.execute(
-                """
-                SELECT * FROM sessions WHERE id = ?
-                """,
-                (session_id,)
-            )
+            cursor = conn.execute(_SQL_GET_SESSION, (session_id,))
             row = cursor.fetchone()
             return dict(row) if row else None
 
@@ -137,86 +312,96 @@ class DatabaseManager:
     def add_tariff(self, name: str, price_per_hour: float, description: str = "") -> int:
         """Add a new tariff."""
         with self.get_connection() as conn:
-            cursor = conn.execute(
-                "INSERT INTO tariffs (name, price_per_hour, description) VALUES (?, ?, ?)",
-                (name, price_per_hour, description)
-            )
-            return cursor.lastrowid
+            cursor = conn.execute(_SQL_ADD_TARIFF, (name, price_per_hour, description))
+        with self._cache_lock:
+            self._tariffs = None
+            self._tariffs_generation += 1
+        return cursor.lastrowid
 
     def get_tariffs(self) -> List[Dict[str, Any]]:
-        """Get all active tariffs."""
-        with self.get_connection() as conn:
-            cursor = conn.execute("SELECT * FROM tariffs WHERE is_active = 1")
-            return [dict(row) for row in cursor.fetchall()]
+        """Get all active tariffs (cached until the next add_tariff)."""
+        tariffs = self._tariffs
+        if tariffs is None:
+            generation = self._tariffs_generation
+            with self.get_connection() as conn:
+                tariffs = conn.execute(_SQL_GET_TARIFFS).fetchall()
+            with self._cache_lock:
+                # Don't cache a result that an add_tariff raced past
+                if generation == self._tariffs_generation:
+                    self._tariffs = tariffs
+        return [dict(row) for row in tariffs]
 
     # Reports
     def get_daily_report(self, date: datetime) -> Dict[str, Any]:
         """Get daily report for a specific date."""
         with self.get_connection() as conn:
-            cursor = conn.execute(
-                """
-                SELECT 
-                    COALESCE(COUNT(*), 0) as total_sessions,
-                    COALESCE(SUM(duration_minutes), 0) as total_minutes,
-                    COALESCE(SUM(amount_paid), 0.0) as total_revenue
-                FROM sessions
-                WHERE DATE(start_time) = DATE(?)
-                """,
-                (date,)
+            return self._read_daily_report(conn, date)
+
+    @staticmethod
+    def _read_daily_report(conn: sqlite3.Connection, date: datetime) -> Dict[str, Any]:
+        # Point lookup in the trigger-maintained sessions_daily rollup
+        row = conn.execute(_SQL_DAILY_REPORT, (date.strftime('%Y-%m-%d'),)).fetchone()
+        return dict(row) if row else dict(_EMPTY_DAILY_REPORT)
+
+    def snapshot(self, computers: bool = True, sessions: bool = True,
+                 report_date: Optional[datetime] = None
+                 ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
+        """Read the dashboard data in one read transaction.
+
+        Returns ``(computers, active_sessions, daily_report)`` as the matching
+        getters would; parts that are not requested come back as None.
+        """
+        conn = self.get_connection()
+        conn.execute(_SQL_BEGIN_READ)
+        try:
+            computer_rows = (
+                [dict(row) for row in conn.execute(_SQL_GET_ALL_COMPUTERS)] if computers else None
+            )
+            session_rows = (
+                [dict(row) for row in conn.execute(_SQL_GET_ACTIVE_SESSIONS)] if sessions else None
             )
-            return dict(cursor.fetchone())
+            report = self._read_daily_report(conn, report_date) if report_date is not None else None
+        finally:
+            conn.commit()
+        return computer_rows, session_rows, report
 
     def get_computer_usage_report(self, computer_id: int, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
-        """Get usage report for a specific computer."""
+        """Get usage report for a specific computer, one dict per day."""
         with self.get_connection() as conn:
             cursor = conn.execute(
-                """
-                SELECT 
-                    DATE(start_time) as date,
-                    COUNT(*) as sessions_count,
-                    SUM(duration_minutes) as total_minutes,
-                    SUM(amount_paid) as total_revenue
-                FROM sessions
-                WHERE computer_id = ? AND start_time BETWEEN ? AND ?
-                GROUP BY DATE(start_time)
-                ORDER BY date
-                """,
-                (computer_id, start_date, end_date)
+                _SQL_COMPUTER_USAGE_REPORT,
+                (computer_id, int(start_date.timestamp()), int(end_date.timestamp()))
             )
-            return [dict(row) for row in cursor.fetchall()]
+            return [dict(row) for row in cursor]
 
     def remove_computer(self, computer_id: int) -> bool:
         """Remove a computer from the database."""
         with self.get_connection() as conn:
             try:
-                # First check if there are any active sessions
-                cursor = conn.execute(
-                    "SELECT COUNT(*) FROM sessions WHERE computer_id = ? AND status = 'active'",
-                    (computer_id,)
-                )
-                if cursor.fetchone()[0] > 0:
-                    return False
-                
-                # Delete the computer
-                conn.execute("DELETE FROM computers WHERE id = ?", (computer_id,))
-                return True
+                # Delete only if there are no active sessions, in one statement
+                cursor = conn.execute(_SQL_DELETE_IDLE_COMPUTER, (computer_id, computer_id))
             except sqlite3.Error:
                 return False
+        if cursor.rowcount <= 0:
+            return False
+        with self._cache_lock:
+            self._computers_by_ip = {
+                ip: entry for ip, entry in self._computers_by_ip.items()
+                if entry[0]['id'] != computer_id
+            }
+        return True
 
     def remove_session(self, session_id: int) -> bool:
         """Remove a session from the database."""
         with self.get_connection() as conn:
             try:
-                conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
-                return True
+                cursor = conn.execute(_SQL_DELETE_SESSION, (session_id,))
+                return cursor.rowcount > 0
             except sqlite3.Error:
                 return False
 
     def add_payment(self, session_id: int, amount: float, payment_method: str) -> int:
         """Add a payment record to the payments table."""
         with self.get_connection() as conn:
-            cursor = conn.execute(
-                "INSERT INTO payments (session_id, amount, payment_method) VALUES (?, ?, ?)",
-                (session_id, amount, payment_method)
-            )
+            cursor = conn.execute(_SQL_ADD_PAYMENT, (session_id, amount, payment_method))
             return cursor.lastrowid 
\ No newline at end of file
@@ -23,7 +23,7 @@ CREATE TABLE IF NOT EXISTS sessions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     computer_id INTEGER NOT NULL,
     tariff_id INTEGER NOT NULL,
-    start_time TIMESTAMP NOT NULL,
+    start_time INTEGER NOT NULL DEFAULT (strftime('%s', 'now')),  -- unix seconds
     end_time TIMESTAMP,
     duration_minutes INTEGER,
     amount_paid DECIMAL(10,2),
@@ -33,6 +33,59 @@ CREATE TABLE IF NOT EXISTS sessions (
     FOREIGN KEY (tariff_id) REFERENCES tariffs(id)
 );
 
+-- Session lookups: active sessions, per-computer usage ranges, daily reports
+-- (computers.ip_address is UNIQUE and already indexed)
+CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions(status);
+CREATE INDEX IF NOT EXISTS idx_sessions_computer_time ON sessions(computer_id, start_time);
+DROP INDEX IF EXISTS idx_sessions_date;
+CREATE INDEX IF NOT EXISTS idx_sessions_start_time ON sessions(start_time);
+
+-- Per-day session totals, keyed by the local date a session started.
+-- Kept in step with sessions by the triggers below so the daily report is a point lookup.
+CREATE TABLE IF NOT EXISTS sessions_daily (
+    day TEXT PRIMARY KEY,
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+    total_minutes INTEGER NOT NULL DEFAULT 0,
+    total_revenue REAL NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_sessions_daily_insert AFTER INSERT ON sessions
+BEGIN
+    INSERT INTO sessions_daily (day, total_sessions, total_minutes, total_revenue)
+    VALUES (date(NEW.start_time, 'unixepoch', 'localtime'), 1,
+            COALESCE(NEW.duration_minutes, 0), COALESCE(NEW.amount_paid, 0))
+    ON CONFLICT(day) DO UPDATE SET
+        total_sessions = total_sessions + 1,
+        total_minutes = total_minutes + excluded.total_minutes,
+        total_revenue = total_revenue + excluded.total_revenue;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sessions_daily_update
+AFTER UPDATE OF start_time, duration_minutes, amount_paid ON sessions
+BEGIN
+    UPDATE sessions_daily SET
+        total_sessions = total_sessions - 1,
+        total_minutes = total_minutes - COALESCE(OLD.duration_minutes, 0),
+        total_revenue = total_revenue - COALESCE(OLD.amount_paid, 0)
+    WHERE day = date(OLD.start_time, 'unixepoch', 'localtime');
+    INSERT INTO sessions_daily (day, total_sessions, total_minutes, total_revenue)
+    VALUES (date(NEW.start_time, 'unixepoch', 'localtime'), 1,
+            COALESCE(NEW.duration_minutes, 0), COALESCE(NEW.amount_paid, 0))
+    ON CONFLICT(day) DO UPDATE SET
+        total_sessions = total_sessions + 1,
+        total_minutes = total_minutes + excluded.total_minutes,
+        total_revenue = total_revenue + excluded.total_revenue;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sessions_daily_delete AFTER DELETE ON sessions
+BEGIN
+    UPDATE sessions_daily SET
+        total_sessions = total_sessions - 1,
+        total_minutes = total_minutes - COALESCE(OLD.duration_minutes, 0),
+        total_revenue = total_revenue - COALESCE(OLD.amount_paid, 0)
+    WHERE day = date(OLD.start_time, 'unixepoch', 'localtime');
+END;
+
 -- Payments table
 CREATE TABLE IF NOT EXISTS payments (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -1,14 +1,48 @@
 import socket
+import select
+import struct
 import json
 import threading
 import logging
 import time
-import netifaces
 from typing import Dict, Optional, List
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Multicast group clients listen on (see DiscoveryClient)
+DISCOVERY_GROUP = '239.255.42.99'
+MULTICAST_TTL = 1  # Stay on the local network segment
+INTERFACE_REFRESH_INTERVAL = 60.0  # Re-enumerate interfaces at most this often
+
+# Latency pings from clients are echoed back with the type rewritten
+PING_PREFIX = b'{"type": "ping"'
+PONG_PREFIX = b'{"type": "pong"'
+
+# Binary announcement: tag, port, name/version/status lengths, feature count,
+# then the UTF-8 strings and one length-prefixed string per feature.
+# Clients still accept JSON, which is used when a field does not fit.
+ANNOUNCE_TAG = 0x01
+ANNOUNCE_HEADER = struct.Struct('!BHBBBB')
+
+def encode_announcement(info: Dict) -> bytes:
+    """Encode server information in the binary announcement format."""
+    name, version, status = (str(info[key]).encode() for key in ('name', 'version', 'status'))
+    features = [str(feature).encode() for feature in info.get('features', [])]
+    if max(len(name), len(version), len(status), len(features),
+           *(len(feature) for feature in features)) > 255:
+        return json.dumps(info).encode()
+    
+    parts = [
+        ANNOUNCE_HEADER.pack(ANNOUNCE_TAG, info['port'], len(name), len(version),
+                             len(status), len(features)),
+        name, version, status
+    ]
+    for feature in features:
+        parts.append(bytes((len(feature),)))
+        parts.append(feature)
+    return b''.join(parts)
+
 @dataclass
 class NetworkInterface:
     name: str
@@ -22,6 +56,9 @@ class DiscoveryService:
         self.broadcast_interval = broadcast_interval
         self.running = False
         self.broadcast_thread: Optional[threading.Thread] = None
+        # Set by stop(); the wake socket interrupts a select() in progress
+        self._stop_event = threading.Event()
+        self._wake_sockets: Optional[tuple] = None
         self.server_info: Dict = {
             'name': 'Gaming Center Server',
             'port': 5001,  # Main server port
@@ -29,26 +66,45 @@ class DiscoveryService:
             'status': 'running',
             'features': ['session_management', 'payment_processing', 'remote_control']
         }
+        # Encoded once and rebuilt only when the info changes
+        self._info_lock = threading.Lock()
+        self._encoded_info: bytes = encode_announcement(self.server_info)
+        # Enumerated on first use and refreshed by the broadcast loop
         self.network_interfaces: List[NetworkInterface] = []
-        self._discover_network_interfaces()
+        self._interfaces_expire = 0.0
+
+    def _discover_network_interfaces(self) -> List[NetworkInterface]:
+        """Discover available network interfaces for broadcasting.
 
-    def _discover_network_interfaces(self):
-        """Discover available network interfaces for broadcasting."""
+        Returns the previous list object unchanged if nothing changed.
+        """
+        interfaces = []
         try:
+            import netifaces  # Only needed when enumerating interfaces
             for interface in netifaces.interfaces():
                 addrs = netifaces.ifaddresses(interface)
                 if netifaces.AF_INET in addrs:
                     for addr in addrs[netifaces.AF_INET]:
                         if 'addr' in addr and 'broadcast' in addr and 'netmask' in addr:
-                            self.network_interfaces.append(NetworkInterface(
+                            interfaces.append(NetworkInterface(
                                 name=interface,
                                 ip=addr['addr'],
                                 broadcast=addr['broadcast'],
                                 netmask=addr['netmask']
                             ))
-            logger.info(f"Discovered {len(self.network_interfaces)} network interfaces")
+            if interfaces != self.network_interfaces:
+                self.network_interfaces = interfaces
+                logger.info(f"Discovered {len(interfaces)} network interfaces")
         except Exception as e:
             logger.error(f"Error discovering network interfaces: {e}")
+        self._interfaces_expire = time.monotonic() + INTERFACE_REFRESH_INTERVAL
+        return self.network_interfaces
+
+    def _current_interfaces(self) -> List[NetworkInterface]:
+        """Return the cached interface list, re-enumerating once it expires."""
+        if time.monotonic() >= self._interfaces_expire:
+            return self._discover_network_interfaces()
+        return self.network_interfaces
 
     def start(self):
         """Start the discovery service."""
@@ -56,6 +112,8 @@ class DiscoveryService:
             return
 
         self.running = True
+        self._stop_event.clear()
+        self._wake_sockets = socket.socketpair()
         self.broadcast_thread = threading.Thread(target=self._broadcast_loop)
         self.broadcast_thread.daemon = True
         self.broadcast_thread.start()
@@ -64,57 +122,96 @@ class DiscoveryService:
     def stop(self):
         """Stop the discovery service."""
         self.running = False
+        self._stop_event.set()
+        if self._wake_sockets:
+            try:
+                self._wake_sockets[1].send(b'\0')
+            except OSError:
+                pass
         if self.broadcast_thread:
             self.broadcast_thread.join(timeout=1.0)
         logger.info("Discovery service stopped")
 
     def _broadcast_loop(self):
         """Main broadcast loop."""
-        sockets = []
+        sock = None
+        wake_reader, wake_writer = self._wake_sockets
         try:
-            # Create UDP sockets for each network interface
-            for interface in self.network_interfaces:
-                try:
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-                    sock.bind((interface.ip, 0))  # Bind to specific interface
-                    sockets.append((sock, interface))
-                    logger.info(f"Created broadcast socket for interface {interface.name}")
-                except Exception as e:
-                    logger.error(f"Error creating socket for interface {interface.name}: {e}")
+            # One socket serves every interface; the outgoing interface is
+            # selected per send and pings arrive on its single ephemeral port
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, MULTICAST_TTL)
+            sock.bind(('', 0))
 
-            if not sockets:
-                logger.error("No valid broadcast interfaces found")
-                return
+            destination = (DISCOVERY_GROUP, self.port)
+            setsockopt, sendto = sock.setsockopt, sock.sendto
+            interfaces: Optional[List[NetworkInterface]] = None
+            targets = []
 
-            while self.running:
+            next_broadcast = time.monotonic()
+            while not self._stop_event.is_set():
                 try:
-                    # Broadcast server information on all interfaces
-                    message = json.dumps(self.server_info).encode()
-                    for sock, interface in sockets:
-                        try:
-                            sock.sendto(message, (interface.broadcast, self.port))
-                            logger.debug(f"Broadcast sent on interface {interface.name}")
-                        except Exception as e:
-                            logger.error(f"Error broadcasting on interface {interface.name}: {e}")
-                    time.sleep(self.broadcast_interval)
+                    if time.monotonic() >= next_broadcast:
+                        current = self._current_interfaces()
+                        if current is not interfaces:
+                            # Resolve per-interface send arguments only when the list changes
+                            interfaces = current
+                            targets = [(socket.inet_aton(interface.ip), interface.name)
+                                       for interface in interfaces]
+                            if targets:
+                                logger.info(f"Broadcasting on {len(targets)} interface(s)")
+                            else:
+                                logger.error("No valid broadcast interfaces found")
+
+                        # Broadcast server information on all interfaces; the log
+                        # level is checked per tick so runtime changes take effect
+                        message = self._encoded_info
+                        debug = logger.isEnabledFor(logging.DEBUG)
+                        for if_addr, name in targets:
+                            try:
+                                setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, if_addr)
+                                sendto(message, destination)
+                                if debug:
+                                    logger.debug("Broadcast sent on interface %s", name)
+                            except Exception as e:
+                                logger.error(f"Error broadcasting on interface {name}: {e}")
+                                # The interface may be gone; re-enumerate before the next tick
+                                self._interfaces_expire = 0.0
+                        next_broadcast = time.monotonic() + self.broadcast_interval
+                    
+                    # Answer latency pings until the next broadcast is due
+                    wait = max(next_broadcast - time.monotonic(), 0)
+                    readable, _, _ = select.select([sock, wake_reader], [], [], wait)
+                    if sock in readable:
+                        self._answer_ping(sock)
                 except Exception as e:
                     logger.error(f"Error in broadcast loop: {e}")
-                    time.sleep(1)
+                    self._stop_event.wait(1)
         except Exception as e:
-            logger.error(f"Error setting up broadcast sockets: {e}")
+            logger.error(f"Error setting up broadcast socket: {e}")
         finally:
             # Clean up sockets
-            for sock, _ in sockets:
-                try:
-                    sock.close()
-                except:
-                    pass
+            for s in (sock, wake_reader, wake_writer):
+                if s is not None:
+                    try:
+                        s.close()
+                    except:
+                        pass
+
+    def _answer_ping(self, sock: socket.socket):
+        """Echo a client latency ping back to its sender."""
+        try:
+            data, addr = sock.recvfrom(256)
+            if data.startswith(PING_PREFIX):
+                sock.sendto(PONG_PREFIX + data[len(PING_PREFIX):], addr)
+        except OSError as e:
+            logger.debug(f"Error answering ping: {e}")
 
     def update_server_info(self, **kwargs):
         """Update server information."""
-        self.server_info.update(kwargs)
+        with self._info_lock:
+            self.server_info.update(kwargs)
+            self._encoded_info = encode_announcement(self.server_info)
         logger.debug(f"Updated server information: {self.server_info}")
 
     def get_server_info(self) -> Dict:
@@ -123,4 +220,4 @@ class DiscoveryService:
 
     def get_network_interfaces(self) -> List[NetworkInterface]:
         """Get list of available network interfaces."""
-        return self.network_interfaces.copy() 
\ No newline at end of file
+        return self._current_interfaces().copy() 
\ No newline at end of file
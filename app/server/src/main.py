@@ -1,34 +1,112 @@
 import sys
 import os
+import functools
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List, Tuple
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QTableWidget, QTableWidgetItem, QSpinBox,
     QComboBox, QMessageBox, QTabWidget, QLineEdit, QDoubleSpinBox
 )
-from PySide6.QtCore import Qt, QTimer, Signal, Slot, QObject
+from PySide6.QtCore import Qt, QTimer, Signal, Slot, QObject, QThread
 from PySide6.QtGui import QIcon, QFont
 import time
+import json
 import logging
+import selectors
 import socket
-import threading
 
 from database.db_manager import DatabaseManager
 from network.network_manager import NetworkManager
 from config import (
     WINDOW_TITLE, WINDOW_MIN_WIDTH, WINDOW_MIN_HEIGHT,
     DEFAULT_SESSION_DURATION, MAX_SESSION_DURATION,
-    CURRENCY_SYMBOL, DATETIME_FORMAT
+    CURRENCY_SYMBOL, DATETIME_FORMAT, ensure_data_dirs
 )
 from discovery_service import DiscoveryService
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional
+    _json_decode = json.JSONDecoder().decode
+    def _json_loads(data):
+        return _json_decode(str(data, 'utf-8'))
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Timestamps repeat across update ticks, so their display strings are memoized
+@functools.lru_cache(maxsize=1024)
+def _format_last_seen(last_seen) -> str:
+    """Format a computer's last_seen value for display."""
+    if not last_seen:
+        return "Never"
+    try:
+        if isinstance(last_seen, str):
+            last_seen = datetime.fromisoformat(last_seen.replace('Z', '+00:00'))
+        return last_seen.strftime(DATETIME_FORMAT)
+    except:
+        return "Invalid Date"
+
+@functools.lru_cache(maxsize=1024)
+def _format_start_time(start_time: int) -> str:
+    """Format a session start time (unix seconds) for display."""
+    return datetime.fromtimestamp(start_time).strftime(DATETIME_FORMAT)
+
+@functools.lru_cache(maxsize=1024)
+def _format_minutes(minutes: int) -> str:
+    return f"{minutes} minutes"
+
+# Status updates arriving within this window are written in one batch
+STATUS_FLUSH_DELAY_MS = 50
+
+# How long end_session waits for the client's session_end reply, counted
+# from when the request was actually written to the client
+SESSION_END_ACK_TIMEOUT_MS = 2000
+
+# Drop clients whose unterminated message grows past this
+MAX_CLIENT_BUFFER = 1024 * 1024
+
+# Size of the reactor's shared receive buffer
+RECV_BUFFER_SIZE = 65536
+
+class ClientState:
+    """Receive state of one connection served by the server reactor."""
+    __slots__ = ('sock', 'address', 'buffer')
+
+    def __init__(self, sock: socket.socket, address: tuple):
+        self.sock = sock
+        self.address = address
+        self.buffer = bytearray()
+
+    def feed(self, data) -> List[bytes]:
+        """Buffer received bytes and return the complete newline-terminated messages.
+
+        ``data`` may be any bytes-like object; it is copied before returning.
+        """
+        start = len(self.buffer)
+        self.buffer += data
+        if self.buffer.find(b'\n', start) == -1:
+            return []
+        lines = self.buffer.split(b'\n')
+        self.buffer = lines.pop()
+        return [line for line in lines if line.strip()]
+
+class ServerThread(QThread):
+    """Runs the server reactor loop off the GUI thread."""
+
+    def __init__(self, serve: Callable[[], None], parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._serve = serve
+
+    def run(self):
+        self._serve()
+
 class StatusUpdater(QObject):
     """Helper class to handle status updates in the main thread."""
     status_update = Signal(str, str)  # client_ip, status
+    message_sent = Signal(str, object, bool)  # client_ip, message, ok
 
 class GamingCenterServer(QMainWindow):
     def __init__(self, host: str = '0.0.0.0', port: int = 5001):
@@ -37,16 +115,50 @@ class GamingCenterServer(QMainWindow):
         self.port = port
         self.running = False
         self.server = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        # The reactor reads every client into this one buffer before framing
+        self._recv_view = memoryview(bytearray(RECV_BUFFER_SIZE))
+        self._server_thread: Optional[QThread] = None
         self.discovery_service = DiscoveryService()
         self.db = DatabaseManager()
         self.network = NetworkManager()
         self.status_updater = StatusUpdater()
         self.status_updater.status_update.connect(self._handle_status_update)
+        self.status_updater.message_sent.connect(self._handle_message_sent)
+        # Rendered table state: key -> row index and key -> [cell texts, cell items]
+        self._computer_rows: Dict[int, int] = {}
+        self._computer_cells: Dict[int, list] = {}
+        self._computer_choices: List[Tuple[int, str]] = []
+        self._session_rows: Dict[int, int] = {}
+        self._session_cells: Dict[int, list] = {}
+        # time.time() at which the earliest session duration text next changes
+        self._sessions_next_change = 0.0
+        self._daily_report_values: Optional[tuple] = None
+        # Last rows read from the database, re-rendered on ticks where nothing was written
+        # Computers are kept column-wise; render ticks only add the client status
+        self._computer_ids: List[int] = []
+        self._computer_id_texts: List[str] = []
+        self._computer_names: List[str] = []
+        self._computer_ips: List[str] = []
+        self._computer_last_seen: List[str] = []
+        self._ip_by_id: Dict[int, str] = {}
+        self._sessions: list = []
+        # Tables whose database rows may have changed since they were last read
+        self._dirty = {"computers": True, "sessions": True, "report": True}
+        # Latest reported status per client IP, waiting for _flush_status_updates
+        self._pending_statuses: Dict[str, str] = {}
+        # Sessions asked to end whose client has not confirmed yet
+        self._pending_session_ends: Dict[int, bool] = {}
         self.setup_ui()
         self.setup_network_handlers()
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_status)
         self.update_timer.start(1000)  # Update every second
+        # The daily report only changes on session writes and when the day rolls over
+        self.report_timer = QTimer()
+        self.report_timer.setSingleShot(True)
+        self.report_timer.timeout.connect(self._roll_over_daily_report)
+        self._schedule_report_rollover()
 
     def setup_ui(self):
         """Setup the main window UI."""
@@ -236,64 +348,141 @@ class GamingCenterServer(QMainWindow):
         
         try:
             session_id = self.db.start_session(computer_id, tariff_id)
-            self.network.send_message(
-                self.get_computer_ip(computer_id),
-                {
-                    "type": "start_session",
-                    "session_id": session_id,
-                    "duration": duration
-                }
-            )
+            self._send(self.get_computer_ip(computer_id), {
+                "type": "start_session",
+                "session_id": session_id,
+                "duration": duration
+            })
             self.load_sessions()
+            self._mark_dirty("report")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to start session: {str(e)}")
 
+    def _sync_table(self, table: QTableWidget, rows: Dict[int, int], cells: Dict[int, list],
+                    records: List[Tuple[int, tuple]],
+                    add_widgets: Callable[[int, int], None]) -> None:
+        """Bring a table in line with ``records``, touching only cells that changed.
+
+        ``records`` is an ordered list of ``(key, texts)`` pairs. ``rows`` maps each
+        key to its row and ``cells`` to its last rendered texts and the items showing
+        them, which are created once per row and reused. ``add_widgets(row, key)``
+        installs the cell widgets of a newly inserted row.
+        """
+        keys = {key for key, _ in records}
+        survivors = [key for key, _ in records if key in rows]
+        if survivors != sorted(survivors, key=rows.__getitem__):
+            # Rows were reordered; start over rather than shuffling them
+            table.setRowCount(0)
+            rows.clear()
+            cells.clear()
+
+        table.setUpdatesEnabled(False)
+        table.blockSignals(True)
+        try:
+            stale = [key for key in rows if key not in keys]
+            for row in sorted((rows[key] for key in stale), reverse=True):
+                table.removeRow(row)
+            for key in stale:
+                del rows[key]
+                del cells[key]
+
+            # Survivors keep their relative order, so each record lands on its own index
+            for row, (key, texts) in enumerate(records):
+                entry = cells.get(key)
+                if entry is None:
+                    table.insertRow(row)
+                    items = [QTableWidgetItem(text) for text in texts]
+                    for col, item in enumerate(items):
+                        table.setItem(row, col, item)
+                    add_widgets(row, key)
+                    cells[key] = [texts, items]
+                elif entry[0] != texts:
+                    for item, before, text in zip(entry[1], entry[0], texts):
+                        if before != text:
+                            item.setText(text)
+                    entry[0] = texts
+                rows[key] = row
+        finally:
+            table.blockSignals(False)
+            table.setUpdatesEnabled(True)
+
+    def _add_computer_widgets(self, row: int, computer_id: int) -> None:
+        """Install the Remove button of a new computer row."""
+        remove_btn = QPushButton("Remove")
+        remove_btn.clicked.connect(functools.partial(self._remove_computer_clicked, computer_id))
+        self.computers_table.setCellWidget(row, 5, remove_btn)
+
+    def _remove_computer_clicked(self, computer_id: int, checked: bool = False):
+        """Slot for a row's Remove button; ``checked`` comes from the clicked signal."""
+        self.remove_computer(computer_id)
+
+    def _mark_dirty(self, *tables: str) -> None:
+        """Flag tables for a database re-read on the next update tick.
+
+        Safe to call from network threads.
+        """
+        for table in tables:
+            self._dirty[table] = True
+
     def load_computers(self):
         """Load computers into the table."""
         try:
-            computers = self.db.get_all_computers()
-            self.computers_table.setRowCount(len(computers))
-            
-            for i, computer in enumerate(computers):
-                self.computers_table.setItem(i, 0, QTableWidgetItem(str(computer['id'])))
-                self.computers_table.setItem(i, 1, QTableWidgetItem(computer['name']))
-                self.computers_table.setItem(i, 2, QTableWidgetItem(computer['ip_address']))
-                
-                # Get current status from network manager
-                current_status = self.network.get_client_status(computer['ip_address'])
-                self.computers_table.setItem(i, 3, QTableWidgetItem(current_status))
-                
-                # Handle last_seen timestamp
-                last_seen = computer['last_seen']
-                if last_seen:
-                    try:
-                        if isinstance(last_seen, str):
-                            last_seen = datetime.fromisoformat(last_seen.replace('Z', '+00:00'))
-                        last_seen_str = last_seen.strftime(DATETIME_FORMAT)
-                    except:
-                        last_seen_str = "Invalid Date"
-                else:
-                    last_seen_str = "Never"
-                
-                self.computers_table.setItem(i, 4, QTableWidgetItem(last_seen_str))
-                
-                # Add remove button
-                remove_btn = QPushButton("Remove")
-                remove_btn.clicked.connect(lambda checked, c=computer: self.remove_computer(c['id']))
-                self.computers_table.setCellWidget(i, 5, remove_btn)
+            self._dirty["computers"] = False
+            self._set_computers(self.db.get_all_computers())
+            self._render_computers()
+        except Exception as e:
+            logger.error(f"Error loading computers: {e}")
+
+    def _set_computers(self, computers) -> None:
+        """Split freshly read computer rows into columns and index their IP addresses by ID."""
+        self._computer_ids = [computer['id'] for computer in computers]
+        self._computer_id_texts = [str(computer_id) for computer_id in self._computer_ids]
+        self._computer_names = [computer['name'] for computer in computers]
+        self._computer_ips = [computer['ip_address'] for computer in computers]
+        self._computer_last_seen = [_format_last_seen(computer['last_seen']) for computer in computers]
+        self._ip_by_id = dict(zip(self._computer_ids, self._computer_ips))
+
+    def _render_computers(self) -> None:
+        """Render computer rows into the table and the session computer combo."""
+        try:
+            # Current status comes from the network manager
+            statuses = map(self.network.get_client_status, self._computer_ips)
+            records = list(zip(self._computer_ids, zip(
+                self._computer_id_texts, self._computer_names, self._computer_ips,
+                statuses, self._computer_last_seen
+            )))
+            self._sync_table(self.computers_table, self._computer_rows, self._computer_cells,
+                             records, self._add_computer_widgets)
             
-            # Preserve current selection in the combo box
-            current_id = self.session_computer_combo.currentData()
-            self.session_computer_combo.clear()
-            for computer in computers:
-                self.session_computer_combo.addItem(computer['name'], computer['id'])
+            # Rebuild the combo box only when the set of computers changed
+            choices = list(zip(self._computer_ids, self._computer_names))
+            if choices == self._computer_choices:
+                return
+            self._computer_choices = choices
+            self._fill_combo(self.session_computer_combo, choices)
+        except Exception as e:
+            logger.error(f"Error rendering computers: {e}")
+
+    def _fill_combo(self, combo: QComboBox, choices: List[Tuple[int, str]]) -> None:
+        """Replace a combo box's (id, name) items, keeping the selected id if it remains.
+
+        Signals are blocked while the items are rebuilt and currentIndexChanged
+        is emitted once afterwards, instead of once per added item.
+        """
+        current_id = combo.currentData()
+        combo.blockSignals(True)
+        try:
+            combo.clear()
+            for item_id, name in choices:
+                combo.addItem(name, item_id)
             # Restore previous selection if possible
             if current_id is not None:
-                index = self.session_computer_combo.findData(current_id)
+                index = combo.findData(current_id)
                 if index != -1:
-                    self.session_computer_combo.setCurrentIndex(index)
-        except Exception as e:
-            logger.error(f"Error loading computers: {e}")
+                    combo.setCurrentIndex(index)
+        finally:
+            combo.blockSignals(False)
+        combo.currentIndexChanged.emit(combo.currentIndex())
 
     def load_tariffs(self):
         """Load tariffs into the table."""
@@ -309,50 +498,120 @@ class GamingCenterServer(QMainWindow):
             ))
         
         # Update tariff combo box
-        self.session_tariff_combo.clear()
-        for tariff in tariffs:
-            self.session_tariff_combo.addItem(tariff['name'], tariff['id'])
+        self._fill_combo(self.session_tariff_combo,
+                         [(tariff['id'], tariff['name']) for tariff in tariffs])
+
+    def _add_session_widgets(self, row: int, session_id: int) -> None:
+        """Install the End Session and Remove buttons of a new session row."""
+        end_btn = QPushButton("End Session")
+        end_btn.clicked.connect(functools.partial(self._confirm_end_session, session_id))
+        self.sessions_table.setCellWidget(row, 5, end_btn)
+        
+        remove_btn = QPushButton("Remove")
+        remove_btn.clicked.connect(functools.partial(self._remove_session_clicked, session_id))
+        self.sessions_table.setCellWidget(row, 6, remove_btn)
+
+    def _confirm_end_session(self, session_id: int, checked: bool = False):
+        """Slot for a row's End Session button; ``checked`` comes from the clicked signal."""
+        self.end_session(session_id)
+
+    def _remove_session_clicked(self, session_id: int, checked: bool = False):
+        """Slot for a row's Remove button; ``checked`` comes from the clicked signal."""
+        self.remove_session(session_id)
 
     def load_sessions(self):
         """Load active sessions into the table."""
-        sessions = self.db.get_active_sessions()
-        self.sessions_table.setRowCount(len(sessions))
-        
-        for i, session in enumerate(sessions):
-            self.sessions_table.setItem(i, 0, QTableWidgetItem(session['computer_name']))
-            self.sessions_table.setItem(i, 1, QTableWidgetItem(session['tariff_name']))
-            self.sessions_table.setItem(i, 2, QTableWidgetItem(
-                session['start_time'].strftime(DATETIME_FORMAT)
-            ))
-            
-            duration = (datetime.now() - session['start_time']).total_seconds() / 60
-            self.sessions_table.setItem(i, 3, QTableWidgetItem(f"{int(duration)} minutes"))
-            self.sessions_table.setItem(i, 4, QTableWidgetItem(session['status']))
-            
-            # End session button
-            end_btn = QPushButton("End Session")
-            end_btn.clicked.connect(lambda checked, s=session: self.end_session(s['id']))
-            self.sessions_table.setCellWidget(i, 5, end_btn)
-            
-            # Remove session button
-            remove_btn = QPushButton("Remove")
-            remove_btn.clicked.connect(lambda checked, s=session: self.remove_session(s['id']))
-            self.sessions_table.setCellWidget(i, 6, remove_btn)
+        self._dirty["sessions"] = False
+        self._sessions = self.db.get_active_sessions()
+        self._render_sessions(self._sessions)
+
+    def _render_sessions(self, sessions) -> None:
+        """Render session rows, recomputing their running durations."""
+        now = time.time()
+        records = []
+        next_change = float('inf')
+        for session in sessions:
+            start_time = session['start_time']  # unix seconds
+            next_change = min(next_change, now + 60 - (now - start_time) % 60)
+            records.append((session['id'], (
+                session['computer_name'],
+                session['tariff_name'],
+                _format_start_time(start_time),
+                _format_minutes(int((now - start_time) // 60)),
+                session['status']
+            )))
+        self._sync_table(self.sessions_table, self._session_rows, self._session_cells,
+                         records, self._add_session_widgets)
+        self._sessions_next_change = next_change
 
     def update_daily_report(self):
         """Update the daily report."""
-        report = self.db.get_daily_report(datetime.now())
-        self.daily_report_table.setRowCount(1)
+        self._dirty["report"] = False
+        self._render_daily_report(self.db.get_daily_report(datetime.now()))
+
+    def _schedule_report_rollover(self) -> None:
+        """Arm the report timer for just after the next local midnight."""
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self.report_timer.start(int((midnight - now).total_seconds() * 1000) + 1000)
+
+    def _roll_over_daily_report(self):
+        """Switch the daily report to the new day."""
+        self._mark_dirty("report")
+        self._schedule_report_rollover()
+
+    def _render_daily_report(self, report: Dict[str, Any]) -> None:
+        """Render the daily report row if its values changed."""
+        values = (
+            str(report.get('total_sessions', 0)),
+            str(report.get('total_minutes', 0)),
+            f"{report.get('total_revenue', 0.0):.2f} {CURRENCY_SYMBOL}"
+        )
+        if values == self._daily_report_values:
+            return
         
-        self.daily_report_table.setItem(0, 0, QTableWidgetItem(str(report.get('total_sessions', 0))))
-        self.daily_report_table.setItem(0, 1, QTableWidgetItem(str(report.get('total_minutes', 0))))
-        self.daily_report_table.setItem(0, 2, QTableWidgetItem(f"{report.get('total_revenue', 0.0):.2f} {CURRENCY_SYMBOL}"))
+        if self._daily_report_values is None:
+            self.daily_report_table.setRowCount(1)
+            for col, text in enumerate(values):
+                self.daily_report_table.setItem(0, col, QTableWidgetItem(text))
+        else:
+            for col, text in enumerate(values):
+                self.daily_report_table.item(0, col).setText(text)
+        self._daily_report_values = values
 
     def update_status(self):
-        """Update the status of all tables."""
-        self.load_computers()
-        self.load_sessions()
-        self.update_daily_report()
+        """Update the status of all tables.
+
+        Only tables marked dirty are re-read from the database; the others are
+        re-rendered from memory to pick up client status and session durations.
+        """
+        reads = [table for table, dirty in self._dirty.items() if dirty]
+        sessions = report = None
+        if reads:
+            # Clear first so a write landing during the read is not lost
+            for table in reads:
+                self._dirty[table] = False
+            try:
+                computers, sessions, report = self.db.snapshot(
+                    "computers" in reads, "sessions" in reads,
+                    datetime.now() if "report" in reads else None
+                )
+            except Exception as e:
+                logger.error(f"Error reading dashboard data: {e}")
+                self._mark_dirty(*reads)  # Retry on the next tick
+                return
+            if computers is not None:
+                self._set_computers(computers)
+            if sessions is not None:
+                self._sessions = sessions
+
+        self._render_computers()
+        # Durations are whole minutes, so unchanged sessions only need a pass
+        # when one of them crosses a minute boundary
+        if sessions is not None or time.time() >= self._sessions_next_change:
+            self._render_sessions(self._sessions)
+        if report is not None:
+            self._render_daily_report(report)
 
     def handle_status_update(self, message: Dict[str, Any], client_ip: str):
         """Handle status update from client in network thread."""
@@ -363,12 +622,26 @@ class GamingCenterServer(QMainWindow):
 
     @Slot(str, str)
     def _handle_status_update(self, client_ip: str, status: str):
-        """Handle status update in main thread."""
+        """Handle status update in main thread.
+
+        Updates are coalesced per client and written by _flush_status_updates.
+        """
+        if not self._pending_statuses:
+            QTimer.singleShot(STATUS_FLUSH_DELAY_MS, self._flush_status_updates)
+        self._pending_statuses[client_ip] = status
+
+    def _flush_status_updates(self):
+        """Write the status updates gathered since the first one in one transaction."""
+        pending, self._pending_statuses = self._pending_statuses, {}
         try:
-            computer = self.db.get_computer_by_ip(client_ip)
-            if computer:
-                self.db.update_computer_status(computer['id'], status)
-                self.load_computers()  # Refresh the display
+            updates = []
+            for client_ip, status in pending.items():
+                computer = self.db.get_computer_by_ip(client_ip)
+                if computer:
+                    updates.append((status, computer['id']))
+            if updates:
+                self.db.update_computer_statuses(updates)
+                self._mark_dirty("computers")  # Picked up by the next update tick
         except Exception as e:
             logger.error(f"Error updating status: {e}")
 
@@ -378,13 +651,18 @@ class GamingCenterServer(QMainWindow):
         duration = message['duration']
         amount = message.get('amount', 0)
         payment_method = message.get('payment_method', 'Unknown')
-        self.db.end_session(session_id, duration, amount)
-        self.db.add_payment(session_id, amount, payment_method)
+        self._pending_session_ends.pop(session_id, None)
+        self.db.finalize_session(session_id, duration, amount, payment_method)
+        self._mark_dirty("sessions", "report")
 
     def get_computer_ip(self, computer_id: int) -> Optional[str]:
         """Get computer IP address by ID."""
-        computer = self.db.get_computer(computer_id)
-        return computer['ip_address'] if computer else None
+        ip_address = self._ip_by_id.get(computer_id)
+        if ip_address is None:
+            # Not loaded yet; fall back to the database
+            computer = self.db.get_computer(computer_id)
+            ip_address = computer['ip_address'] if computer else None
+        return ip_address
 
     def remove_computer(self, computer_id: int):
         """Remove a computer."""
@@ -398,22 +676,17 @@ class GamingCenterServer(QMainWindow):
         
         if reply == QMessageBox.Yes:
             # Get computer IP before removal
-            computer = self.db.get_computer(computer_id)
-            if not computer:
+            ip_address = self.get_computer_ip(computer_id)
+            if not ip_address:
                 QMessageBox.warning(self, "Error", "Computer not found")
                 return
 
             # Try to notify client about removal, but continue even if it fails
-            try:
-                self.network.send_message(
-                    computer['ip_address'],
-                    {"type": "computer_removed"}
-                )
-            except:
-                pass  # Ignore notification errors
+            self._send(ip_address, {"type": "computer_removed"})
 
             # Remove the computer from database
             if self.db.remove_computer(computer_id):
+                self._ip_by_id.pop(computer_id, None)
                 self.load_computers()
                 QMessageBox.information(self, "Success", "Computer removed successfully")
             else:
@@ -436,6 +709,7 @@ class GamingCenterServer(QMainWindow):
         if reply == QMessageBox.Yes:
             if self.db.remove_session(session_id):
                 self.load_sessions()
+                self._mark_dirty("report")
                 QMessageBox.information(self, "Success", "Session removed successfully")
             else:
                 QMessageBox.warning(self, "Error", "Could not remove session")
@@ -459,35 +733,62 @@ class GamingCenterServer(QMainWindow):
                     return
 
                 # Get computer IP
-                computer = self.db.get_computer(session['computer_id'])
-                if not computer:
+                ip_address = self.get_computer_ip(session['computer_id'])
+                if not ip_address:
                     QMessageBox.warning(self, "Error", "Computer not found")
                     return
 
-                # Notify client about session end
-                if self.network.send_message(
-                    computer['ip_address'],
-                    {
-                        "type": "end_session",
-                        "session_id": session_id,
-                        "force_end": True
-                    }
-                ):
-                    # Wait a moment for client to process
-                    time.sleep(1)
-                    
-                    # End session in database
-                    self.db.end_session(session_id, 0, 0)  # Duration and amount will be calculated
-                    self.load_sessions()
-                    QMessageBox.information(self, "Success", "Session ended successfully")
-                else:
-                    QMessageBox.warning(self, "Error", "Could not notify client. The computer might be offline.")
+                # Notify client about session end. The client's session_end
+                # reply records the session; if it does not arrive in time
+                # after the request is sent, close the session here instead
+                self._pending_session_ends[session_id] = True
+                self._send(ip_address, {
+                    "type": "end_session",
+                    "session_id": session_id,
+                    "force_end": True
+                })
+                QMessageBox.information(self, "Success", "Session is being ended")
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Could not end session: {str(e)}")
 
+    def _send(self, client_ip: str, message: Dict[str, Any]) -> None:
+        """Queue a message for a client without blocking the GUI thread."""
+        self.network.send_many([(client_ip, message)], self.status_updater.message_sent.emit)
+
+    @Slot(str, object, bool)
+    def _handle_message_sent(self, client_ip: str, message: Dict[str, Any], ok: bool):
+        """Handle the outcome of a queued send in the main thread."""
+        if message.get("type") != "end_session":
+            return
+        session_id = message["session_id"]
+        if ok:
+            # Start the reply watchdog only now, so a slow write cannot outlast it
+            QTimer.singleShot(
+                SESSION_END_ACK_TIMEOUT_MS,
+                functools.partial(self._finalize_if_pending, session_id)
+            )
+            return
+        # The client never got the request, so there is no reply to wait for;
+        # leave the session open
+        self._pending_session_ends.pop(session_id, None)
+        QMessageBox.warning(self, "Error", "Could not notify client. The computer might be offline.")
+
+    def _finalize_if_pending(self, session_id: int):
+        """End a session the client never confirmed."""
+        if self._pending_session_ends.pop(session_id, None) is None:
+            return
+        try:
+            self.db.end_session(session_id, 0, 0)  # Duration and amount will be calculated
+            self.load_sessions()
+            self._mark_dirty("report")
+        except Exception as e:
+            logger.error(f"Error ending session {session_id}: {e}")
+
     def closeEvent(self, event):
         """Handle window close event."""
+        self.stop()
         self.network.close()
+        self.db.close()
         event.accept()
 
     def start(self):
@@ -507,29 +808,47 @@ class GamingCenterServer(QMainWindow):
             self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server.bind((self.host, self.port))
             self.server.listen(5)
+            self.server.setblocking(False)
+            
+            # One thread multiplexes the listener and every client socket
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self.server, selectors.EVENT_READ)
             self.running = True
             
             logger.info(f"Server started on {self.host}:{self.port}")
             
+            # The reactor blocks in select(), so it runs on its own thread
+            self._server_thread = ServerThread(self._serve, self)
+            self._server_thread.start()
+        except Exception as e:
+            logger.error(f"Error starting server: {e}")
+            self.stop()
+
+    def _serve(self):
+        """Reactor loop: accept clients and dispatch their messages until stopped."""
+        try:
             while self.running:
                 try:
-                    client_socket, address = self.server.accept()
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client_socket, address)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
+                    for key, _ in self._selector.select(timeout=1.0):
+                        if key.data is None:
+                            self._accept_client()
+                        else:
+                            self._handle_client(key.data)
                 except Exception as e:
                     if self.running:
-                        logger.error(f"Error accepting connection: {e}")
-        except Exception as e:
-            logger.error(f"Error starting server: {e}")
-            self.stop()
+                        logger.error(f"Error in server loop: {e}")
+        finally:
+            self._close_clients()
 
     def stop(self):
         """Stop the server."""
         self.running = False
+        if self._server_thread:
+            # The reactor notices within one select() timeout
+            self._server_thread.wait(2000)
+            self._server_thread = None
+        else:
+            self._close_clients()
         if self.server:
             try:
                 self.server.close()
@@ -538,20 +857,64 @@ class GamingCenterServer(QMainWindow):
         self.discovery_service.stop()
         logger.info("Server stopped")
 
-    def _handle_client(self, client_socket: socket.socket, address: tuple):
-        """Handle client connection."""
+    def _accept_client(self):
+        """Accept a pending connection and register it with the reactor."""
         try:
-            logger.info(f"New connection from {address}")
-            // ... existing client handling code ...
-        except Exception as e:
-            logger.error(f"Error handling client {address}: {e}")
-        finally:
+            client_socket, address = self.server.accept()
+        except BlockingIOError:
+            return
+        client_socket.setblocking(False)
+        logger.info(f"New connection from {address}")
+        self._selector.register(client_socket, selectors.EVENT_READ, ClientState(client_socket, address))
+
+    def _handle_client(self, client: ClientState):
+        """Read from a readable client and dispatch its complete messages."""
+        try:
+            size = client.sock.recv_into(self._recv_view)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.error(f"Error handling client {client.address}: {e}")
+            size = 0
+        if not size:
+            self._close_client(client)
+            return
+        
+        for line in client.feed(self._recv_view[:size]):
             try:
-                client_socket.close()
-            except:
-                pass
+                message = _json_loads(line)
+            except ValueError:
+                logger.error(f"Invalid JSON from client {client.address}")
+                continue
+            self.network.dispatch(message, client.address[0])
+        
+        if len(client.buffer) > MAX_CLIENT_BUFFER:
+            logger.error(f"Message too large from client {client.address}")
+            self._close_client(client)
+
+    def _close_client(self, client: ClientState):
+        """Unregister and close a client connection."""
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            client.sock.close()
+        except:
+            pass
+
+    def _close_clients(self):
+        """Close every client connection and the reactor's selector."""
+        if self._selector is None:
+            return
+        for key in list(self._selector.get_map().values()):
+            if key.data is not None:
+                self._close_client(key.data)
+        self._selector.close()
+        self._selector = None
 
 def main():
+    ensure_data_dirs()
     app = QApplication(sys.argv)
     window = GamingCenterServer()
     window.show()
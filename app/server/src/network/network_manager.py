@@ -1,23 +1,91 @@
+import os
 import socket
 import json
+import queue
 import threading
-from typing import Dict, Any, Callable, Optional, Iterator
+import functools
+import selectors
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, Iterator, List, Tuple
 from zeroconf import ServiceBrowser, Zeroconf, ServiceListener
 import logging
-import time
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional
+    # Compact UTF-8 output, as orjson writes it
+    _json_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    _json_decode = json.JSONDecoder().decode
+    def _json_dumps(obj) -> bytes:
+        return _json_encode(obj).encode()
+    def _json_loads(data):
+        # Decodes bytes-like input, including memoryview, in one UTF-8 pass
+        return _json_decode(str(data, 'utf-8'))
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Size of the network loop's receive buffer, which also caps the length of one message
+RECV_SIZE = 65536
+
+# Most connections accepted per readiness event of the listen socket
+ACCEPT_BATCH = 64
+
+# Pause after a failed accept, since the listen socket stays readable and would spin the loop
+ACCEPT_ERROR_BACKOFF = 0.1
+
+# Pending connections the kernel queues for the accept loop
+LISTEN_BACKLOG = socket.SOMAXCONN
+
+# Threads running message handlers, so a slow handler does not stall the network loop
+HANDLER_WORKERS = (os.cpu_count() or 1) * 2
+
+# A client that accepts no data for this long is dropped instead of stalling the sender
+SEND_TIMEOUT = 5.0
+
+# Kernel send/receive buffer size; set on the listen socket so accepted sockets inherit it
+SOCKET_BUFFER_SIZE = 256 * 1024
+
+class _ClientConnection:
+    """Receive state of one client served by the network loop."""
+    __slots__ = ('sock', 'ip', 'partial')
+
+    def __init__(self, sock: socket.socket, ip: str):
+        self.sock = sock
+        self.ip = ip
+        # Start of a message whose terminator has not arrived yet
+        self.partial = b''
+
 class NetworkManager(ServiceListener):
     def __init__(self, port: int = 5000):
         self.port = port
         self.clients: Dict[str, socket.socket] = {}
+        # Each client's bound sendall, resolved once at accept time
+        self._senders: Dict[str, Callable[[bytes], None]] = {}
         self.client_status: Dict[str, str] = {}  # Track client status
         self.message_handlers: Dict[str, Callable] = {}
+        self._handler_pool = ThreadPoolExecutor(max_workers=HANDLER_WORKERS,
+                                                thread_name_prefix="handler")
+        # Messages waiting for a client's handler task; a client has an entry
+        # exactly while a task is draining it, which keeps its messages in order
+        self._handler_queues: Dict[str, collections.deque] = {}
+        self._handler_lock = threading.Lock()
+        # Only the network loop reads, so every client shares one receive buffer
+        self._recv_buffer = bytearray(RECV_SIZE)
+        self._recv_view = memoryview(self._recv_buffer)
+        # Set by close(); the wake socket interrupts a select() in progress
+        self._stop_event = threading.Event()
+        self._wake_sockets: Optional[tuple] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        # Batches queued by send_many, written by the sender thread
+        self._send_queue: queue.Queue = queue.Queue()
         self.zeroconf = Zeroconf()
         self._setup_service_discovery()
         self._start_server()
+        threading.Thread(target=self._drain_send_queue, daemon=True).start()
 
     def __iter__(self) -> Iterator[str]:
         """Make the class iterable by yielding service names."""
@@ -32,83 +100,197 @@ class NetworkManager(ServiceListener):
         """Start the TCP server."""
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
         self.server_socket.bind(('0.0.0.0', self.port))
-        self.server_socket.listen(5)
+        self.server_socket.listen(LISTEN_BACKLOG)
+        self.server_socket.setblocking(False)
         
-        # Start accepting connections in a separate thread
-        threading.Thread(target=self._accept_connections, daemon=True).start()
+        # One thread multiplexes the listen socket and every client socket;
+        # each registration's data is the callback for its read events
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.server_socket, selectors.EVENT_READ, self._on_accept)
+        self._wake_sockets = socket.socketpair()
+        self._selector.register(self._wake_sockets[0], selectors.EVENT_READ, self._on_wake)
+        self._loop_thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._loop_thread.start()
 
-    def _accept_connections(self) -> None:
-        """Accept incoming client connections."""
-        while True:
+    def _run_loop(self) -> None:
+        """Dispatch read events until close() sets the stop event."""
+        selector = self._selector
+        try:
+            while not self._stop_event.is_set():
+                for key, _ in selector.select():
+                    try:
+                        key.data()
+                    except Exception as e:
+                        logger.error(f"Error in network loop: {e}")
+        except OSError as e:
+            logger.error(f"Network loop failed: {e}")
+        finally:
+            # The loop owns its sockets, so it closes them on the way out
+            for key in list(selector.get_map().values()):
+                key.fileobj.close()
+            self._wake_sockets[1].close()
+            selector.close()
+
+    def _on_wake(self) -> None:
+        """Consume the wake-up byte sent by close()."""
+        try:
+            self._wake_sockets[0].recv(64)
+        except OSError:
+            pass
+
+    def _on_accept(self) -> None:
+        """Accept the pending connections and register them with the loop."""
+        # Drain the backlog so a burst of connects costs one wakeup
+        for _ in range(ACCEPT_BATCH):
             try:
-                if not hasattr(self, 'server_socket') or self.server_socket._closed:
-                    break
-                    
                 client_socket, address = self.server_socket.accept()
-                client_ip = address[0]
-                logger.info(f"New client connected from {client_ip}")
-                
-                # Start a new thread to handle client communication
-                threading.Thread(
-                    target=self._handle_client,
-                    args=(client_socket, client_ip),
-                    daemon=True
-                ).start()
-            except Exception as e:
-                if not hasattr(self, 'server_socket') or self.server_socket._closed:
-                    break
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionAbortedError:
+                continue  # The client gave up before it was accepted
+            except OSError as e:
+                # Typically out of file descriptors; the pending connection is
+                # still queued, so wait a little before select() reports it again
                 logger.error(f"Error accepting connection: {e}")
-                time.sleep(1)  # Add delay to prevent CPU spinning
+                self._stop_event.wait(ACCEPT_ERROR_BACKOFF)
+                return
+            self._add_connection(client_socket, address[0])
 
-    def _handle_client(self, client_socket: socket.socket, client_ip: str) -> None:
-        """Handle communication with a client."""
+    def _add_connection(self, client_socket: socket.socket, client_ip: str) -> None:
+        """Track a newly accepted client and start reading from it."""
+        logger.info(f"New client connected from {client_ip}")
+        
+        # Reads only happen once the socket is readable, so the timeout only
+        # bounds how long the sender thread's sendall() can wait on this client
+        client_socket.settimeout(SEND_TIMEOUT)
+        # Messages are small and latency-sensitive, so send them without Nagle delays
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        connection = _ClientConnection(client_socket, client_ip)
+        self._senders[client_ip] = client_socket.sendall
+        self.clients[client_ip] = client_socket
+        self.client_status[client_ip] = "online"
+        logger.info(f"Client {client_ip} status: online")
+        self._selector.register(client_socket, selectors.EVENT_READ,
+                                functools.partial(self._on_client_readable, connection))
+
+    def _on_client_readable(self, connection: _ClientConnection) -> None:
+        """Read from a readable client and process its complete messages."""
+        client_ip = connection.ip
+        buffer, view = self._recv_buffer, self._recv_view
+        # Reads land after the client's partial message, if any
+        start = len(connection.partial)
+        buffer[:start] = connection.partial
         try:
-            self.clients[client_ip] = client_socket
-            self.client_status[client_ip] = "online"
-            logger.info(f"Client {client_ip} status: online")
-            
-            while True:
+            size = connection.sock.recv_into(view[start:])
+        except (BlockingIOError, InterruptedError):
+            return
+        except ConnectionResetError:
+            logger.error(f"Connection reset by client {client_ip}")
+            size = 0
+        except OSError as e:
+            logger.error(f"Error handling client {client_ip}: {e}")
+            size = 0
+        if not size:
+            self._drop_connection(connection)
+            return
+        end = start + size
+        
+        # Messages are newline-terminated; decode each one straight from the buffer
+        consumed = 0
+        newline = buffer.find(b'\n', start, end)
+        while newline != -1:
+            if newline > consumed:
                 try:
-                    data = client_socket.recv(4096)
-                    if not data:
-                        break
-                    
-                    message = json.loads(data.decode('utf-8'))
-                    self._process_message(message, client_ip)
-                except json.JSONDecodeError:
+                    message = _json_loads(view[consumed:newline])
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict):
                     logger.error(f"Invalid JSON from client {client_ip}")
-                    break
-                except ConnectionResetError:
-                    logger.error(f"Connection reset by client {client_ip}")
-                    break
-                except Exception as e:
-                    logger.error(f"Error handling client {client_ip}: {e}")
-                    break
-        except Exception as e:
-            logger.error(f"Error in client handler for {client_ip}: {e}")
-        finally:
-            self._remove_client(client_ip)
+                    self._drop_connection(connection)
+                    return
+                self._submit_message(message, client_ip)
+            consumed = newline + 1
+            newline = buffer.find(b'\n', consumed, end)
+        
+        if not consumed and end == RECV_SIZE:
+            logger.error(f"Message too large from client {client_ip}")
+            self._drop_connection(connection)
+            return
+        connection.partial = bytes(view[consumed:end])
+
+    def _drop_connection(self, connection: _ClientConnection) -> None:
+        """Unregister and close a client connection on the loop thread."""
+        # A reconnect from the same IP may already have replaced this socket
+        if self.clients.get(connection.ip) is connection.sock:
+            self._remove_client(connection.ip)
+        self._selector.unregister(connection.sock)
+        connection.sock.close()
 
     def _process_message(self, message: Dict[str, Any], client_ip: str) -> None:
         """Process incoming messages from clients."""
+        if not isinstance(message, dict):
+            logger.error(f"Ignoring non-object message from client {client_ip}")
+            return
         message_type = message.get('type')
-        if message_type in self.message_handlers:
+        handler = self.message_handlers.get(message_type)
+        if handler is not None:
             try:
-                self.message_handlers[message_type](message, client_ip)
+                handler(message, client_ip)
             except Exception as e:
                 logger.error(f"Error processing message {message_type}: {e}")
 
-    def _remove_client(self, client_ip: str) -> None:
-        """Remove a disconnected client."""
-        if client_ip in self.clients:
+    def _submit_message(self, message: Dict[str, Any], client_ip: str) -> None:
+        """Queue a message for the handler pool behind the client's earlier ones."""
+        with self._handler_lock:
+            pending = self._handler_queues.get(client_ip)
+            if pending is not None:
+                pending.append(message)
+                return
+            self._handler_queues[client_ip] = collections.deque((message,))
+        self._handler_pool.submit(self._run_handlers, client_ip)
+
+    def _run_handlers(self, client_ip: str) -> None:
+        """Process a client's queued messages in order until none are left."""
+        while True:
+            with self._handler_lock:
+                pending = self._handler_queues[client_ip]
+                if not pending:
+                    del self._handler_queues[client_ip]
+                    return
+                message = pending.popleft()
+            # Never let a message end the task early: the queue entry must be
+            # removed above, or later messages from this client would stall
             try:
-                self.clients[client_ip].close()
-            except:
-                pass
-            del self.clients[client_ip]
-            self.client_status[client_ip] = "offline"
-            logger.info(f"Client {client_ip} status: offline")
+                self._process_message(message, client_ip)
+            except Exception as e:
+                logger.error(f"Error processing message from client {client_ip}: {e}")
+
+    def dispatch(self, message: Dict[str, Any], client_ip: str) -> None:
+        """Dispatch a message received on another connection to its handler."""
+        self._process_message(message, client_ip)
+
+    def _remove_client(self, client_ip: str) -> None:
+        """Remove a disconnected client.
+
+        The socket is only shut down here; the network loop sees the
+        connection end and closes it. The loop and the sender thread may both
+        call this for the same client, and only the one whose pop() wins does
+        the cleanup.
+        """
+        client_socket = self.clients.pop(client_ip, None)
+        if client_socket is None:
+            return
+        self._senders.pop(client_ip, None)
+        try:
+            client_socket.shutdown(socket.SHUT_RDWR)
+        except:
+            pass
+        self.client_status[client_ip] = "offline"
+        logger.info(f"Client {client_ip} status: offline")
 
     def register_handler(self, message_type: str, handler: Callable) -> None:
         """Register a handler for a specific message type."""
@@ -116,14 +298,82 @@ class NetworkManager(ServiceListener):
 
     def send_message(self, client_ip: str, message: Dict[str, Any]) -> bool:
         """Send a message to a specific client."""
-        if client_ip not in self.clients:
+        return self._send_data(client_ip, self._encode(message))
+
+    def send_many(self, messages: List[Tuple[str, Dict[str, Any]]],
+                  on_sent: Optional[Callable[[str, Dict[str, Any], bool], None]] = None) -> None:
+        """Queue (client_ip, message) pairs for the sender thread and return immediately.
+
+        ``on_sent(client_ip, message, ok)`` is called from the sender thread
+        after each send; a message queued for several clients is encoded once.
+        """
+        self._send_queue.put((messages, on_sent))
+
+    def _drain_send_queue(self) -> None:
+        """Write queued batches until close() queues None.
+
+        Everything queued by the time the sender wakes up is written with a
+        single sendall() per client.
+        """
+        stopping = False
+        while not stopping:
+            batches = [self._send_queue.get()]
+            while True:
+                try:
+                    batches.append(self._send_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            # Bodies and terminators are gathered separately and joined once per client
+            encoded: Dict[int, bytes] = {}
+            outgoing: Dict[str, List[bytes]] = {}
+            reports = []
+            for batch in batches:
+                if batch is None:
+                    stopping = True
+                    break
+                messages, on_sent = batch
+                for client_ip, message in messages:
+                    body = encoded.get(id(message))
+                    if body is None:
+                        body = encoded[id(message)] = _json_dumps(message)
+                    outgoing.setdefault(client_ip, []).extend((body, b'\n'))
+                    if on_sent:
+                        reports.append((on_sent, client_ip, message))
+            
+            frames: Dict[int, bytes] = {}
+            sent: Dict[str, bool] = {}
+            for client_ip, chunks in outgoing.items():
+                if len(chunks) == 2:
+                    # A lone message, as a broadcast leaves for each client;
+                    # its frame is built once and written to every client
+                    body = chunks[0]
+                    data = frames.get(id(body))
+                    if data is None:
+                        data = frames[id(body)] = body + b'\n'
+                else:
+                    data = b''.join(chunks)
+                sent[client_ip] = self._send_data(client_ip, data)
+            for on_sent, client_ip, message in reports:
+                try:
+                    on_sent(client_ip, message, sent[client_ip])
+                except Exception as e:
+                    logger.error(f"Error reporting send to {client_ip}: {e}")
+
+    @staticmethod
+    def _encode(message: Dict[str, Any]) -> bytes:
+        """Serialize a message into its newline-terminated wire form."""
+        return _json_dumps(message) + b'\n'
+
+    def _send_data(self, client_ip: str, data: bytes) -> bool:
+        """Write an encoded message to a specific client."""
+        send = self._senders.get(client_ip)
+        if send is None:
             logger.warning(f"Client {client_ip} not connected")
             return False
         
         try:
-            self.clients[client_ip].sendall(
-                (json.dumps(message) + '\n').encode('utf-8')
-            )
+            send(data)
             return True
         except Exception as e:
             logger.error(f"Error sending message to {client_ip}: {e}")
@@ -131,21 +381,30 @@ class NetworkManager(ServiceListener):
             return False
 
     def broadcast_message(self, message: Dict[str, Any]) -> None:
-        """Broadcast a message to all connected clients."""
-        for client_ip in list(self.clients.keys()):
-            self.send_message(client_ip, message)
+        """Broadcast a message to all connected clients without waiting for the writes."""
+        # The sender thread encodes the shared message once for every client
+        self.send_many([(client_ip, message) for client_ip in list(self.clients)])
 
     def get_connected_clients(self) -> list:
         """Get list of connected client IPs."""
-        return list(self.clients.keys())
+        return list(self.clients)
 
     def close(self) -> None:
         """Close all connections and cleanup."""
+        self._send_queue.put(None)
         try:
-            for client_ip in list(self.clients.keys()):
+            for client_ip in list(self.clients):
                 self._remove_client(client_ip)
-            if hasattr(self, 'server_socket'):
-                self.server_socket.close()
+            # The loop closes the listen and client sockets as it exits
+            self._stop_event.set()
+            if self._wake_sockets:
+                try:
+                    self._wake_sockets[1].send(b'\0')
+                except OSError:
+                    pass
+            if self._loop_thread:
+                self._loop_thread.join(timeout=1.0)
+            self._handler_pool.shutdown(wait=False, cancel_futures=True)
             if hasattr(self, 'zeroconf'):
                 self.zeroconf.close()
         except Exception as e: